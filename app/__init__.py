@@ -4,10 +4,12 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_login import LoginManager
 from dotenv import load_dotenv
+from app.config import engine_options
+from app.services.db_routing import RoutingSession, REPLICA_BIND_KEY
 
 load_dotenv()
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 bcrypt = Bcrypt()
 login_manager = LoginManager()
 login_manager.login_view = 'auth.login'
@@ -19,23 +21,59 @@ def create_app():
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'default_secret_key')
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+    # Optional read replica; views marked @read_replica send their reads there
+    replica_url = os.getenv('DATABASE_REPLICA_URL')
+    if replica_url:
+        app.config['SQLALCHEMY_BINDS'] = {REPLICA_BIND_KEY: dict(engine_options(replica_url), url=replica_url)}
+    app.config['EVENT_BROKER'] = os.getenv('EVENT_BROKER', 'app.services.events.InProcessBroker')
+    app.config['SSE_KEEPALIVE_SECONDS'] = int(os.getenv('SSE_KEEPALIVE_SECONDS', '15'))
+    app.config['LEADERBOARD_TTL_SECONDS'] = int(os.getenv('LEADERBOARD_TTL_SECONDS', '10'))
+    app.config['QUIZ_PAYLOAD_CACHE_SIZE'] = int(os.getenv('QUIZ_PAYLOAD_CACHE_SIZE', '128'))
+    app.config['QUIZ_SESSION_WINDOW'] = int(os.getenv('QUIZ_SESSION_WINDOW', '5')) # Questions per fetch on the session page
+    # With several worker processes a role change, deactivation or delete can take this long to reach
+    # the other workers (each caches users itself); 0 disables the cache and re-reads the user per request
+    app.config['IDENTITY_CACHE_TTL_SECONDS'] = int(os.getenv('IDENTITY_CACHE_TTL_SECONDS', '60'))
+    app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv('BCRYPT_LOG_ROUNDS', '12'))
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', '2'))
+    app.config['PASSWORD_HASH_MAX_PENDING'] = int(os.getenv('PASSWORD_HASH_MAX_PENDING', '32'))
+    app.config['DASHBOARD_STATS_TTL_SECONDS'] = int(os.getenv('DASHBOARD_STATS_TTL_SECONDS', '60'))
+    app.config['BACKGROUND_JOB_WORKERS'] = int(os.getenv('BACKGROUND_JOB_WORKERS', '1'))
+    app.config['QUIZ_DELETE_BACKGROUND_THRESHOLD'] = int(os.getenv('QUIZ_DELETE_BACKGROUND_THRESHOLD', '5000')) # Rows under a quiz
+    app.config['QUIZ_DELETE_BATCH_SIZE'] = int(os.getenv('QUIZ_DELETE_BATCH_SIZE', '1000')) # Contestants per committed batch
+    app.config['INSTRUMENTATION_ENABLED'] = os.getenv('INSTRUMENTATION_ENABLED', 'True') == 'True'
+    app.config['SQL_N_PLUS_ONE_THRESHOLD'] = int(os.getenv('SQL_N_PLUS_ONE_THRESHOLD', '5')) # Repeats of one statement per request
 
     db.init_app(app)
     bcrypt.init_app(app)
     login_manager.init_app(app)
 
-    from app.models.user import User
+    from app.services import assets, dashboard_stats, identity, events, hashing, instrumentation, jobs, leaderboard, quiz_payload
+    instrumentation.init_app(app)
+    assets.init_app(app)
+    hashing.init_app(app)
+    identity.init_app(app)
+    events.init_app(app)
+    leaderboard.init_app(app)
+    quiz_payload.init_app(app)
+    dashboard_stats.init_app(app)
+    jobs.init_app(app)
 
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return identity.load_user(user_id)
 
     from app.routes.auth import auth_bp
     from app.routes.admin import admin_bp
     from app.routes.moderator import moderator_bp
+    from app.routes.health import health_bp
 
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(admin_bp, url_prefix='/admin')
     app.register_blueprint(moderator_bp, url_prefix='/moderator')
+    app.register_blueprint(health_bp)
+
+    from app.commands import register_commands
+    register_commands(app)
 
     return app
@@ -0,0 +1,144 @@
+# app/commands.py
+
+import click
+from flask import current_app
+from sqlalchemy.exc import DBAPIError
+from app import db
+from app.models.quiz import Quiz
+from app.services import assets, exporter, importer, migrations, query_plans, question_stats
+
+
+def register_commands(app):
+    app.cli.add_command(import_questions_command)
+    app.cli.add_command(import_contestants_command)
+    app.cli.add_command(export_results_command)
+    app.cli.add_command(db_command)
+    app.cli.add_command(question_stats_command)
+    app.cli.add_command(assets_command)
+
+
+@click.command('import-questions')
+@click.argument('quiz_id', type=int)
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), help='Defaults to the file extension.')
+@click.option('--batch-size', default=500, show_default=True, help='Rows per committed transaction.')
+def import_questions_command(quiz_id, path, fmt, batch_size):
+    """Stream questions from a CSV or JSONL file into a quiz."""
+    quiz = db.session.get(Quiz, quiz_id)
+    if quiz is None:
+        raise click.ClickException(f'Quiz {quiz_id} not found.')
+    fmt = importer.detect_format(path, fmt)
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        report = importer.import_questions(quiz, stream, fmt, batch_size=batch_size)
+    click.echo(f'Inserted {report.inserted} questions, skipped {report.skipped} rows.')
+    for error in report.errors:
+        click.echo(f"  line {error['line']}: {error['error']}", err=True)
+
+
+@click.command('import-contestants')
+@click.argument('quiz_id', type=int)
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), help='Defaults to the file extension.')
+@click.option('--batch-size', default=5000, show_default=True, help='Rows per committed transaction.')
+def import_contestants_command(quiz_id, path, fmt, batch_size):
+    """Stream a contestant roster from a CSV or JSONL file into a quiz."""
+    quiz = db.session.get(Quiz, quiz_id)
+    if quiz is None:
+        raise click.ClickException(f'Quiz {quiz_id} not found.')
+    fmt = importer.detect_format(path, fmt)
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        report = importer.import_contestants(quiz, stream, fmt, batch_size=batch_size)
+    click.echo(f'Registered {report.inserted} contestants, skipped {report.skipped} rows.')
+    for error in report.errors:
+        click.echo(f"  line {error['line']}: {error['error']}", err=True)
+
+
+@click.command('export-results')
+@click.argument('quiz_id', type=int)
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default='csv', show_default=True)
+@click.option('--answers', is_flag=True, help='Include one row per recorded answer.')
+@click.option('--output', type=click.File('w', encoding='utf-8'), default='-', help='Defaults to stdout.')
+def export_results_command(quiz_id, fmt, answers, output):
+    """Stream a quiz's results as CSV or JSONL."""
+    if db.session.get(Quiz, quiz_id) is None:
+        raise click.ClickException(f'Quiz {quiz_id} not found.')
+    for chunk in exporter.iter_export(quiz_id, fmt=fmt, include_answers=answers):
+        output.write(chunk)
+
+
+@click.group('db')
+def db_command():
+    """Schema migrations and query plan checks."""
+
+
+def _echo_plans(title, plans):
+    click.echo(f'== {title} ==')
+    for label, lines in plans:
+        click.echo(f'-- {label}')
+        for line in lines:
+            click.echo(f'   {line}')
+
+
+@db_command.command('upgrade')
+@click.option('--target', type=int, help='Stop after this version.')
+@click.option('--explain', is_flag=True, help='Print EXPLAIN plans for the main route queries before and after.')
+def db_upgrade_command(target, explain):
+    """Apply pending schema migrations."""
+    before = None
+    if explain:
+        try:
+            before = query_plans.explain_all()
+        except DBAPIError: # Empty database: nothing to plan yet
+            db.session.rollback()
+    ran = migrations.upgrade(target=target, echo=click.echo)
+    click.echo(f'Applied {len(ran)} migration(s); schema is at version {migrations.current_version()}.')
+    if explain:
+        if before:
+            _echo_plans('Before', before)
+        _echo_plans('After', query_plans.explain_all())
+
+
+@db_command.command('status')
+def db_status_command():
+    """Show applied and pending migrations."""
+    applied = migrations.applied_versions()
+    for migration in migrations.discover():
+        row = applied.get(migration.version)
+        state = f"applied {row.applied_at:%Y-%m-%d %H:%M}" if row else 'pending'
+        click.echo(f'{migration.version:04d} {migration.name:<32} {state}')
+
+
+@db_command.command('explain')
+def db_explain_command():
+    """Print EXPLAIN plans for the main route queries."""
+    _echo_plans('Query plans', query_plans.explain_all())
+
+
+@click.command('question-stats')
+@click.option('--quiz-id', type=int, help='Limit to one quiz (default: all quizzes).')
+@click.option('--verify', is_flag=True, help='Only report counters that differ from the raw answers.')
+def question_stats_command(quiz_id, verify):
+    """Rebuild (or verify) the per-question answer counters from contestant answers."""
+    if verify:
+        mismatches = question_stats.verify(quiz_id)
+        for mismatch in mismatches:
+            click.echo(f"question {mismatch['question_id']}: stored {mismatch['stored']} actual {mismatch['actual']}")
+        click.echo(f'{len(mismatches)} question(s) out of step.')
+        if mismatches:
+            raise SystemExit(1)
+        return
+    rows = question_stats.recompute(quiz_id)
+    db.session.commit()
+    click.echo(f'Rebuilt counters for {rows} question(s).')
+
+
+@click.group('assets')
+def assets_command():
+    """Static asset build."""
+
+
+@assets_command.command('build')
+def assets_build_command():
+    """Fingerprint and precompress static assets into static/dist."""
+    manifest = assets.build(current_app.static_folder, echo=click.echo)
+    click.echo(f'Built {len(manifest)} asset(s); restart the app to serve them.')
@@ -0,0 +1,12 @@
+"""Create the base tables (role, user, quiz, question, contestant, contestant_answer)."""
+
+from app import db
+
+TABLES = ('role', 'user', 'quiz', 'question', 'contestant', 'contestant_answer') # Later tables belong to their own migrations
+
+
+def upgrade(conn):
+    # Existing installs were built with db.create_all(), so only missing tables
+    # are created; columns and indexes added since are handled by later versions.
+    import app.models.user, app.models.quiz # noqa: F401 -- register the tables on db.metadata
+    db.metadata.create_all(conn, tables=[db.metadata.tables[name] for name in TABLES], checkfirst=True)
@@ -0,0 +1,8 @@
+"""Add quiz.content_version, which keys the cached quiz session payload."""
+
+from app.services.migrations import has_column
+
+
+def upgrade(conn):
+    if not has_column(conn, 'quiz', 'content_version'):
+        conn.exec_driver_sql('ALTER TABLE quiz ADD COLUMN content_version INTEGER NOT NULL DEFAULT 0')
@@ -0,0 +1,32 @@
+"""Make (contestant_id, question_id) unique on contestant_answer, removing duplicate answers first."""
+
+import sqlalchemy as sa
+from app.services.migrations import has_index, create_index
+
+CONSTRAINT = 'uq_contestant_answer_contestant_question'
+
+
+def upgrade(conn):
+    if has_index(conn, 'contestant_answer', CONSTRAINT):
+        return
+
+    # Keep the most recent answer for each pair, as the moderator last recorded it
+    duplicates = conn.execute(sa.text(
+        'SELECT DISTINCT contestant_id FROM contestant_answer '
+        'GROUP BY contestant_id, question_id HAVING COUNT(*) > 1'
+    )).scalars().all()
+    if duplicates:
+        conn.execute(sa.text(
+            'DELETE FROM contestant_answer WHERE id NOT IN ('
+            'SELECT MAX(id) FROM contestant_answer GROUP BY contestant_id, question_id)'
+        ))
+        # Scores were incremented per answer, so recount them from what is left
+        conn.execute(sa.text(
+            'UPDATE contestant SET score = (SELECT COUNT(*) FROM contestant_answer '
+            'WHERE contestant_answer.contestant_id = contestant.id AND contestant_answer.is_correct) '
+            'WHERE id = :id'
+        ), [{'id': contestant_id} for contestant_id in duplicates])
+
+    # A unique index serves as the ON CONFLICT target on both PostgreSQL and SQLite,
+    # which cannot add constraints to an existing table
+    create_index(conn, CONSTRAINT, 'contestant_answer', ['contestant_id', 'question_id'], unique=True)
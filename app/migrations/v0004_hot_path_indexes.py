@@ -0,0 +1,27 @@
+"""Index the hot lookup paths and the admin list sort keys."""
+
+from app.services.migrations import create_index
+
+# Built one at a time outside a transaction (CONCURRENTLY on PostgreSQL)
+transactional = False
+
+INDEXES = (
+    # quiz(is_active, quiz_date): moderator dashboard and upcoming-quiz lists
+    ('ix_quiz_is_active_quiz_date', 'quiz', ['is_active', 'quiz_date']),
+    ('ix_quiz_quiz_date_id', 'quiz', ['quiz_date', 'id']),
+    ('ix_quiz_title_id', 'quiz', ['title', 'id']),
+    # question(quiz_id, ...): session payload and question lists
+    ('ix_question_quiz_id_id', 'question', ['quiz_id', 'id']),
+    # contestant(quiz_id, ...): rosters, results, leaderboard rebuilds
+    ('ix_contestant_quiz_id_score_id', 'contestant', ['quiz_id', 'score', 'id']),
+    ('ix_contestant_quiz_id_name_id', 'contestant', ['quiz_id', 'name', 'id']),
+    # contestant_answer(contestant_id, question_id) is covered by the unique index;
+    # question_id alone serves per-question stats and question deletes
+    ('ix_contestant_answer_question_id', 'contestant_answer', ['question_id']),
+    ('ix_user_role_id_username_id', 'user', ['role_id', 'username', 'id']),
+)
+
+
+def upgrade(conn):
+    for name, table, columns in INDEXES:
+        create_index(conn, name, table, columns)
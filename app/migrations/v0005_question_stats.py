@@ -0,0 +1,15 @@
+"""Add the question_stat counters table and backfill it from existing answers."""
+
+import sqlalchemy as sa
+from app import db
+
+
+def upgrade(conn):
+    import app.models.quiz # noqa: F401 -- register the table on db.metadata
+    from app.services import question_stats
+    table = db.metadata.tables['question_stat']
+    if sa.inspect(conn).has_table(table.name):
+        return
+    table.create(conn)
+    for statement in question_stats.recompute_statements():
+        conn.execute(statement)
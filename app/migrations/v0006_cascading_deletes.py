@@ -0,0 +1,38 @@
+"""Cascade quiz, question and contestant deletes in the database, and add the background_job table."""
+
+import sqlalchemy as sa
+from app import db
+
+# (table, column, referenced table, on delete)
+FOREIGN_KEYS = (
+    ('question', 'quiz_id', 'quiz', 'CASCADE'),
+    ('contestant', 'quiz_id', 'quiz', 'CASCADE'),
+    ('contestant_answer', 'contestant_id', 'contestant', 'CASCADE'),
+    ('contestant_answer', 'question_id', 'question', 'CASCADE'),
+    ('question_stat', 'question_id', 'question', 'CASCADE'),
+)
+
+
+def upgrade(conn):
+    import app.models.job # noqa: F401 -- register the table on db.metadata
+    inspector = sa.inspect(conn)
+    if not inspector.has_table('background_job'):
+        db.metadata.tables['background_job'].create(conn)
+
+    # SQLite cannot alter constraints in place; the delete paths remove children
+    # explicitly, so only PostgreSQL needs its foreign keys rebuilt
+    if conn.dialect.name != 'postgresql':
+        return
+    preparer = conn.dialect.identifier_preparer
+    for table, column, referred, on_delete in FOREIGN_KEYS:
+        for fk in inspector.get_foreign_keys(table):
+            if fk['constrained_columns'] != [column] or fk['referred_table'] != referred:
+                continue
+            if (fk.get('options') or {}).get('ondelete', '').upper() == on_delete:
+                continue
+            name = preparer.quote(fk['name'])
+            conn.exec_driver_sql(f'ALTER TABLE {preparer.quote(table)} DROP CONSTRAINT {name}')
+            conn.exec_driver_sql(
+                f'ALTER TABLE {preparer.quote(table)} ADD CONSTRAINT {name} FOREIGN KEY ({preparer.quote(column)}) '
+                f'REFERENCES {preparer.quote(referred)} (id) ON DELETE {on_delete}'
+            )
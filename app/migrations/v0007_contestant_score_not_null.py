@@ -0,0 +1,10 @@
+"""Backfill contestant.score and make it NOT NULL, so (score, id) keyset pages never meet a NULL key."""
+
+
+def upgrade(conn):
+    conn.exec_driver_sql('UPDATE contestant SET score = 0 WHERE score IS NULL')
+    # SQLite cannot change a column's nullability in place; the model's default
+    # keeps new rows non-NULL there
+    if conn.dialect.name == 'postgresql':
+        conn.exec_driver_sql('ALTER TABLE contestant ALTER COLUMN score SET DEFAULT 0')
+        conn.exec_driver_sql('ALTER TABLE contestant ALTER COLUMN score SET NOT NULL')
@@ -0,0 +1,31 @@
+# app/models/job.py
+
+from app import db
+
+class BackgroundJob(db.Model):
+    # Progress of long-running work, stored in the database so any worker process can report it
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False) # e.g. 'delete_quiz'
+    target_id = db.Column(db.Integer, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='pending') # pending, running, finished, failed
+    total = db.Column(db.Integer, nullable=False, default=0)
+    done = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='SET NULL'), nullable=True)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def as_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'target_id': self.target_id,
+            'status': self.status,
+            'total': self.total,
+            'done': self.done,
+            'percent': round(100.0 * self.done / self.total, 1) if self.total else (100.0 if self.status == 'finished' else 0.0),
+            'error': self.error
+        }
+
+    def __repr__(self):
+        return f"<BackgroundJob {self.kind}:{self.target_id} {self.status}>"
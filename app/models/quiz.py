@@ -2,6 +2,13 @@ from app import db
 from datetime import datetime
 
 class Quiz(db.Model):
+    # Keyset pagination keys for the quiz list: (sort column, id)
+    __table_args__ = (
+        db.Index('ix_quiz_is_active_quiz_date', 'is_active', 'quiz_date'),
+        db.Index('ix_quiz_quiz_date_id', 'quiz_date', 'id'),
+        db.Index('ix_quiz_title_id', 'title', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=True)
@@ -9,16 +16,22 @@ class Quiz(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     admin_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    content_version = db.Column(db.Integer, nullable=False, default=0, server_default='0') # Bumped when questions change; keys the session payload cache
 
-    questions = db.relationship('Question', backref='quiz', lazy=True, cascade='all, delete-orphan')
-    contestants = db.relationship('Contestant', backref='quiz', lazy=True, cascade='all, delete-orphan')
+    # The database cascades deletes (ON DELETE CASCADE), so the ORM never loads children just to delete them
+    questions = db.relationship('Question', backref='quiz', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    contestants = db.relationship('Contestant', backref='quiz', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
 
     def __repr__(self):
         return f"<Quiz '{self.title}'>"
 
 class Question(db.Model):
+    __table_args__ = (
+        db.Index('ix_question_quiz_id_id', 'quiz_id', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id', ondelete='CASCADE'), nullable=False)
     question_text = db.Column(db.Text, nullable=False)
     option_a = db.Column(db.String(200), nullable=False)
     option_b = db.Column(db.String(200), nullable=False)
@@ -31,27 +44,54 @@ class Question(db.Model):
         return f"<Question '{self.question_text[:30]}...'>"
 
 class Contestant(db.Model):
+    # Per-quiz roster pages are sorted by name or score, with id breaking ties
+    __table_args__ = (
+        db.Index('ix_contestant_quiz_id_name_id', 'quiz_id', 'name', 'id'),
+        db.Index('ix_contestant_quiz_id_score_id', 'quiz_id', 'score', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id', ondelete='CASCADE'), nullable=False)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), nullable=True) # Optional, for future use
-    score = db.Column(db.Integer, default=0)
+    score = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     submitted_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
-    answers = db.relationship('ContestantAnswer', backref='contestant', lazy=True, cascade='all, delete-orphan')
+    answers = db.relationship('ContestantAnswer', backref='contestant', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
 
     def __repr__(self):
         return f"<Contestant '{self.name}'>"
 
 class ContestantAnswer(db.Model):
+    # One answer per contestant per question; also the conflict target for upserts
+    __table_args__ = (
+        db.UniqueConstraint('contestant_id', 'question_id', name='uq_contestant_answer_contestant_question'),
+        db.Index('ix_contestant_answer_question_id', 'question_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    contestant_id = db.Column(db.Integer, db.ForeignKey('contestant.id'), nullable=False)
-    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False)
+    contestant_id = db.Column(db.Integer, db.ForeignKey('contestant.id', ondelete='CASCADE'), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id', ondelete='CASCADE'), nullable=False)
     selected_option = db.Column(db.String(1), nullable=False) # 'a', 'b', 'c', 'd'
     is_correct = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
 
-    question = db.relationship('Question', backref='contestant_answers', lazy=True)
+    question = db.relationship('Question', backref=db.backref('contestant_answers', lazy=True, passive_deletes=True), lazy=True)
 
     def __repr__(self):
         return f"<ContestantAnswer Contestant:{self.contestant_id} Question:{self.question_id} Selected:{self.selected_option}>"
+
+class QuestionStat(db.Model):
+    # Answer counters per question, kept in step with contestant_answer by the answers service
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id', ondelete='CASCADE'), primary_key=True)
+    answered = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    correct = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    count_a = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    count_b = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    count_c = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    count_d = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    question = db.relationship('Question', backref=db.backref('stat', uselist=False, lazy=True, cascade='all, delete-orphan'))
+
+    def __repr__(self):
+        return f"<QuestionStat Question:{self.question_id} {self.correct}/{self.answered}>"
@@ -1,6 +1,7 @@
 # app/models/user.py
 
-from app import db, bcrypt # Import bcrypt here
+from app import db
+from app.services.hashing import get_hasher
 from flask_login import UserMixin
 
 class Role(db.Model):
@@ -12,6 +13,11 @@ class Role(db.Model):
         return f"<Role '{self.name}'>"
 
 class User(db.Model, UserMixin):
+    # Role-filtered user lists page by (role_id, username, id)
+    __table_args__ = (
+        db.Index('ix_user_role_id_username_id', 'role_id', 'username', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -23,10 +29,13 @@ class User(db.Model, UserMixin):
 
     # --- ADD THESE METHODS ---
     def set_password(self, password):
-        self.password = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password = get_hasher().hash_password(password)
 
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password, password)
+        return get_hasher().check_password(self.password, password)
+
+    def password_needs_rehash(self):
+        return get_hasher().needs_rehash(self.password)
     # --- END ADDITIONS ---
 
     def __repr__(self):
@@ -1,10 +1,22 @@
 # app/routes/admin.py
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, Response, render_template, request, redirect, url_for, flash, abort
 from flask_login import login_required, current_user
-from app import db, bcrypt
+from app import db
 from app.models.user import User, Role
-from app.models.quiz import Quiz, Question, Contestant
+from app.models.quiz import Quiz, Question, Contestant, ContestantAnswer
 from app.routes.auth import role_required
+from app.services import dashboard_stats
+from app.services import identity
+from app.services import importer
+from app.services import instrumentation
+from app.services import jobs
+from app.services.db_routing import read_replica
+from app.services.hashing import get_hasher
+from app.services import leaderboard
+from app.services import pagination
+from app.services import question_stats
+from app.services import quiz_payload
+from app.services import quiz_deletion
 from datetime import datetime
 
 admin_bp = Blueprint('admin', __name__)
@@ -15,22 +27,21 @@ def superadmin_required(f):
 
 @admin_bp.route('/dashboard')
 @role_required('admin', 'superadmin')
+@read_replica
 def dashboard():
-    total_quizzes = Quiz.query.count()
-    total_users = User.query.count()
-    total_contestants = Contestant.query.count()
-    upcoming_quizzes = Quiz.query.filter(Quiz.quiz_date > datetime.now()).order_by(Quiz.quiz_date.asc()).limit(5).all()
+    stats = dashboard_stats.get_admin_stats()
     return render_template('admin/dashboard.html',
-                           total_quizzes=total_quizzes,
-                           total_users=total_users,
-                           total_contestants=total_contestants,
-                           upcoming_quizzes=upcoming_quizzes)
+                           total_quizzes=stats['total_quizzes'],
+                           total_users=stats['total_users'],
+                           total_contestants=stats['total_contestants'],
+                           upcoming_quizzes=stats['upcoming_quizzes'])
 
 # --- Admin Management Routes ---
 
 @admin_bp.route('/manage_admins')
 @login_required
 @superadmin_required # Only superadmins can manage other admins
+@read_replica
 def manage_admins():
     # Fetch all users who have the 'admin' role
     # We explicitly exclude superadmins from this list for management, as they manage admins
@@ -69,14 +80,13 @@ def add_admin():
             flash('Email already exists.', 'danger')
             return render_template('admin/add_admin.html')
 
-        hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
-
         admin_role = Role.query.filter_by(name='admin').first()
         if not admin_role:
             flash('Admin role not found in the database. Please ensure roles are seeded.', 'danger')
             return render_template('admin/add_admin.html')
 
-        new_admin = User(username=username, email=email, password=hashed_password, role=admin_role)
+        new_admin = User(username=username, email=email, role=admin_role)
+        new_admin.set_password(password)
         db.session.add(new_admin)
         db.session.commit()
         flash(f'Admin {username} added successfully!', 'success')
@@ -112,6 +122,7 @@ def delete_admin(admin_id):
     try:
         db.session.delete(admin_to_delete)
         db.session.commit()
+        identity.invalidate_user(admin_id)
         flash(f'Admin {admin_to_delete.username} deleted successfully!', 'success')
     except Exception as e:
         db.session.rollback()
@@ -145,9 +156,10 @@ def change_admin_password(admin_id):
         elif len(new_password) < 6: # Example: set a minimum password length
             flash('New password must be at least 6 characters long.', 'danger')
         else:
-            admin_user.password = bcrypt.generate_password_hash(new_password).decode('utf-8')
+            admin_user.set_password(new_password)
             try:
                 db.session.commit()
+                identity.invalidate_user(admin_id)
                 flash(f'Password for admin {admin_user.username} changed successfully!', 'success')
                 return redirect(url_for('admin.manage_admins'))
             except Exception as e:
@@ -157,11 +169,44 @@ def change_admin_password(admin_id):
     return render_template('admin/change_admin_password.html', admin_user=admin_user)
 
 
+@admin_bp.route('/metrics/password_hashing')
+@login_required
+@superadmin_required
+def password_hashing_metrics():
+    """Queue depth and latency of the bcrypt worker pool, as JSON."""
+    return get_hasher().metrics()
+
+
+@admin_bp.route('/metrics')
+@role_required('admin', 'superadmin')
+def metrics():
+    """
+    Per-endpoint latency, SQL statement count and SQL time histograms, N+1
+    warnings and password hashing stats for this worker, in Prometheus text format.
+    """
+    text = instrumentation.get_metrics().render(instrumentation.hashing_lines(get_hasher().metrics()))
+    return Response(text, mimetype='text/plain; version=0.0.4')
+
+
+@admin_bp.route('/metrics/n_plus_one')
+@role_required('admin', 'superadmin')
+def n_plus_one_report():
+    """The most recent statement shapes flagged as likely N+1 queries, as JSON."""
+    return {'threshold': instrumentation.get_metrics().n_plus_one_threshold,
+            'recent': list(instrumentation.get_metrics().recent_n_plus_one)}
+
+
 @admin_bp.route('/moderators')
 @role_required('admin', 'superadmin')
+@read_replica
 def moderator_list():
-    moderators = User.query.join(Role).filter(Role.name == 'moderator').all()
-    return render_template('admin/moderator_list.html', moderators=moderators)
+    query = User.query.join(Role).filter(Role.name == 'moderator')
+    term = pagination.search_term()
+    if term:
+        query = query.filter(pagination.contains(User.username, term) | pagination.contains(User.email, term))
+    page = pagination.keyset_paginate(query, {'username': User.username, 'email': User.email, 'id': User.id},
+                                      default_sort='username', id_column=User.id)
+    return render_template('admin/moderator_list.html', moderators=page.items, page=page)
 
 @admin_bp.route('/moderators/add', methods=['GET', 'POST'])
 @role_required('admin', 'superadmin')
@@ -185,8 +230,8 @@ def add_moderator():
             flash('Moderator role not found. Please seed roles.', 'danger')
             return redirect(url_for('admin.moderator_list'))
 
-        hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
-        new_moderator = User(username=username, email=email, password=hashed_password, role=moderator_role)
+        new_moderator = User(username=username, email=email, role=moderator_role)
+        new_moderator.set_password(password)
         db.session.add(new_moderator)
         db.session.commit()
         flash('Moderator added successfully!', 'success')
@@ -211,10 +256,11 @@ def edit_moderator(user_id):
             return redirect(url_for('admin.edit_moderator', user_id=user_id))
 
         if new_password:
-            moderator.password = bcrypt.generate_password_hash(new_password).decode('utf-8')
+            moderator.set_password(new_password)
 
         try:
             db.session.commit()
+            identity.invalidate_user(user_id)
             flash('Moderator updated successfully!', 'success')
             return redirect(url_for('admin.moderator_list'))
         except Exception as e:
@@ -235,6 +281,7 @@ def disable_moderator(user_id):
     try:
         db.session.delete(moderator)
         db.session.commit()
+        identity.invalidate_user(user_id)
         flash('Moderator disabled (deleted) successfully!', 'success')
     except Exception as e:
         db.session.rollback()
@@ -243,9 +290,16 @@ def disable_moderator(user_id):
 
 @admin_bp.route('/quizzes')
 @role_required('admin', 'superadmin')
+@read_replica
 def quiz_settings():
-    quizzes = Quiz.query.all()
-    return render_template('admin/quiz_settings.html', quizzes=quizzes)
+    query = Quiz.query
+    term = pagination.search_term()
+    if term:
+        query = query.filter(pagination.contains(Quiz.title, term))
+    page = pagination.keyset_paginate(query, {'quiz_date': Quiz.quiz_date, 'title': Quiz.title, 'id': Quiz.id},
+                                      default_sort='quiz_date', id_column=Quiz.id, default_direction='desc')
+    job_id = request.args.get('job', type=int) # Background delete to show progress for
+    return render_template('admin/quiz_settings.html', quizzes=page.items, page=page, job_id=job_id)
 
 @admin_bp.route('/quizzes/add', methods=['GET', 'POST'])
 @role_required('admin', 'superadmin')
@@ -292,6 +346,7 @@ def edit_quiz(quiz_id):
             flash('Invalid date format. Please use YYYY-MM-DDTHH:MM.', 'danger')
             return redirect(url_for('admin.edit_quiz', quiz_id=quiz_id))
 
+        quiz_payload.invalidate(quiz) # The session payload carries the title
         try:
             db.session.commit()
             flash('Quiz updated successfully!', 'success')
@@ -305,32 +360,44 @@ def edit_quiz(quiz_id):
 @role_required('admin', 'superadmin')
 def delete_quiz(quiz_id):
     quiz = Quiz.query.get_or_404(quiz_id)
+    title = quiz.title # The job's commit expires quiz, and its row may be gone before we read it again
 
     try:
-        # If your database relationships for Question and Contestant
-        # are configured with ON DELETE CASCADE, deleting the quiz
-        # will automatically delete its associated questions and contestants.
-        # Otherwise, you might need to explicitly delete them here
-        # before deleting the quiz to avoid foreign key constraint errors.
-        # Example if not using cascade:
-        # Question.query.filter_by(quiz_id=quiz.id).delete()
-        # Contestant.query.filter_by(quiz_id=quiz.id).delete()
-        # db.session.commit() # Commit these deletions if done explicitly
-
-        db.session.delete(quiz)
-        db.session.commit()
+        # Questions, contestants and answers go with set-based DELETEs; large
+        # quizzes are handed to a background job instead of holding the request
+        job = quiz_deletion.delete_quiz(quiz, user_id=current_user.id)
+        if job is not None:
+            flash(f'Quiz "{title}" is being deleted in the background.', 'info')
+            return redirect(url_for('admin.quiz_settings', job=job.id))
         flash('Quiz deleted successfully!', 'success')
     except Exception as e:
         db.session.rollback()
         flash(f'Error deleting quiz: {e}', 'danger')
     return redirect(url_for('admin.quiz_settings'))
 
+@admin_bp.route('/jobs/<int:job_id>')
+@role_required('admin', 'superadmin')
+def job_status(job_id):
+    """
+    Progress of a background job as JSON, polled by the quiz list while a
+    large quiz is being deleted.
+    """
+    job = jobs.get_job(job_id)
+    if job is None:
+        abort(404)
+    return job.as_dict()
+
 @admin_bp.route('/quizzes/<int:quiz_id>/questions')
 @role_required('admin', 'superadmin')
+@read_replica
 def manage_questions(quiz_id):
     quiz = Quiz.query.get_or_404(quiz_id)
-    questions = Question.query.filter_by(quiz_id=quiz.id).all()
-    return render_template('admin/manage_questions.html', quiz=quiz, questions=questions)
+    query = Question.query.filter_by(quiz_id=quiz.id)
+    term = pagination.search_term()
+    if term:
+        query = query.filter(pagination.contains(Question.question_text, term))
+    page = pagination.keyset_paginate(query, {'id': Question.id}, default_sort='id', id_column=Question.id)
+    return render_template('admin/manage_questions.html', quiz=quiz, questions=page.items, page=page)
 
 @admin_bp.route('/quizzes/<int:quiz_id>/questions/add', methods=['GET', 'POST'])
 @role_required('admin', 'superadmin')
@@ -362,11 +429,39 @@ def add_question(quiz_id):
             correct_answer=correct_answer
         )
         db.session.add(new_question)
+        quiz_payload.invalidate(quiz)
         db.session.commit()
         flash('Question added successfully!', 'success')
         return redirect(url_for('admin.manage_questions', quiz_id=quiz_id))
     return render_template('admin/add_question.html', quiz=quiz)
 
+@admin_bp.route('/quizzes/<int:quiz_id>/questions/import', methods=['GET', 'POST'])
+@role_required('admin', 'superadmin')
+def import_questions(quiz_id):
+    quiz = Quiz.query.get_or_404(quiz_id)
+    report = None
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('Please choose a CSV or JSONL file to import.', 'danger')
+            return redirect(url_for('admin.import_questions', quiz_id=quiz_id))
+
+        try:
+            fmt = importer.detect_format(upload.filename, request.form.get('format'))
+            report = importer.import_questions(quiz, upload.stream, fmt)
+        except ValueError as e: # Unsupported format or undecodable file
+            db.session.rollback()
+            flash(f'Import failed: {e}', 'danger')
+            return redirect(url_for('admin.import_questions', quiz_id=quiz_id))
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Error importing questions: {e}', 'danger')
+            return redirect(url_for('admin.import_questions', quiz_id=quiz_id))
+
+        category = 'success' if not report.skipped else 'warning'
+        flash(f'Imported {report.inserted} questions; {report.skipped} rows skipped.', category)
+    return render_template('admin/import_questions.html', quiz=quiz, report=report)
+
 @admin_bp.route('/quizzes/<int:quiz_id>/questions/edit/<int:question_id>', methods=['GET', 'POST'])
 @role_required('admin', 'superadmin')
 def edit_question(quiz_id, question_id):
@@ -392,6 +487,7 @@ def edit_question(quiz_id, question_id):
             flash('Correct answer must be a, b, c, or d.', 'danger')
             return redirect(url_for('admin.edit_question', quiz_id=quiz_id, question_id=question_id))
 
+        quiz_payload.invalidate(quiz)
         try:
             db.session.commit()
             flash('Question updated successfully!', 'success')
@@ -411,7 +507,10 @@ def delete_question(quiz_id, question_id):
         return redirect(url_for('admin.manage_questions', quiz_id=quiz_id))
 
     try:
+        # Answers are removed in one statement (the ORM no longer loads them to delete)
+        ContestantAnswer.query.filter_by(question_id=question.id).delete(synchronize_session=False)
         db.session.delete(question)
+        quiz_payload.invalidate(quiz)
         db.session.commit()
         flash('Question deleted successfully!', 'success')
     except Exception as e:
@@ -422,10 +521,16 @@ def delete_question(quiz_id, question_id):
 
 @admin_bp.route('/quizzes/<int:quiz_id>/contestants')
 @role_required('admin', 'superadmin')
+@read_replica
 def contestant_registration(quiz_id):
     quiz = Quiz.query.get_or_404(quiz_id)
-    contestants = Contestant.query.filter_by(quiz_id=quiz_id).all()
-    return render_template('admin/contestant_registration.html', quiz=quiz, contestants=contestants)
+    query = Contestant.query.filter_by(quiz_id=quiz_id)
+    term = pagination.search_term()
+    if term:
+        query = query.filter(pagination.contains(Contestant.name, term) | pagination.contains(Contestant.email, term))
+    page = pagination.keyset_paginate(query, {'name': Contestant.name, 'score': Contestant.score, 'id': Contestant.id},
+                                      default_sort='name', id_column=Contestant.id)
+    return render_template('admin/contestant_registration.html', quiz=quiz, contestants=page.items, page=page)
 
 @admin_bp.route('/quizzes/<int:quiz_id>/contestants/add', methods=['GET', 'POST'])
 @role_required('admin', 'superadmin')
@@ -442,10 +547,38 @@ def add_contestant(quiz_id):
         new_contestant = Contestant(quiz_id=quiz.id, name=name, email=email if email else None)
         db.session.add(new_contestant)
         db.session.commit()
+        leaderboard.get_store().invalidate(quiz.id)
         flash('Contestant registered successfully!', 'success')
         return redirect(url_for('admin.contestant_registration', quiz_id=quiz_id))
     return render_template('admin/add_contestant.html', quiz=quiz)
 
+@admin_bp.route('/quizzes/<int:quiz_id>/contestants/import', methods=['GET', 'POST'])
+@role_required('admin', 'superadmin')
+def import_contestants(quiz_id):
+    quiz = Quiz.query.get_or_404(quiz_id)
+    report = None
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('Please choose a CSV or JSONL roster to upload.', 'danger')
+            return redirect(url_for('admin.import_contestants', quiz_id=quiz_id))
+
+        try:
+            fmt = importer.detect_format(upload.filename, request.form.get('format'))
+            report = importer.import_contestants(quiz, upload.stream, fmt)
+        except ValueError as e: # Unsupported format or undecodable file
+            db.session.rollback()
+            flash(f'Roster upload failed: {e}', 'danger')
+            return redirect(url_for('admin.import_contestants', quiz_id=quiz_id))
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Error registering contestants: {e}', 'danger')
+            return redirect(url_for('admin.import_contestants', quiz_id=quiz_id))
+
+        category = 'success' if not report.skipped else 'warning'
+        flash(f'Registered {report.inserted} contestants; {report.skipped} rows skipped.', category)
+    return render_template('admin/import_contestants.html', quiz=quiz, report=report)
+
 @admin_bp.route('/quizzes/<int:quiz_id>/contestants/edit/<int:contestant_id>', methods=['GET', 'POST'])
 @role_required('admin', 'superadmin')
 def edit_contestant(quiz_id, contestant_id):
@@ -465,6 +598,7 @@ def edit_contestant(quiz_id, contestant_id):
 
         try:
             db.session.commit()
+            leaderboard.get_store().invalidate(quiz.id)
             flash('Contestant updated successfully!', 'success')
             return redirect(url_for('admin.contestant_registration', quiz_id=quiz_id))
         except Exception as e:
@@ -482,8 +616,11 @@ def delete_contestant(quiz_id, contestant_id):
         return redirect(url_for('admin.contestant_registration', quiz_id=quiz_id))
 
     try:
+        question_stats.discount_contestants([contestant.id])
+        ContestantAnswer.query.filter_by(contestant_id=contestant.id).delete(synchronize_session=False)
         db.session.delete(contestant)
         db.session.commit()
+        leaderboard.get_store().invalidate(quiz.id)
         flash('Contestant deleted successfully!', 'success')
     except Exception as e:
         db.session.rollback()
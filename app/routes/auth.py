@@ -4,6 +4,7 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_user, logout_user, current_user, login_required
 from app import db, bcrypt
 from app.models.user import User
+from app.services import identity
 import functools
 
 auth_bp = Blueprint('auth', __name__)
@@ -20,6 +21,11 @@ def login():
         user = User.query.filter_by(username=username).first()
 
         if user and user.check_password(password):
+            # Upgrade the stored hash when the configured bcrypt cost has changed
+            if user.password_needs_rehash():
+                user.set_password(password)
+                db.session.commit()
+                identity.invalidate_user(user.id)
             login_user(user)
             flash(f'Logged in successfully as {user.username}.', 'success')
             return redirect(url_for('auth.dashboard_redirect'))
@@ -57,6 +63,7 @@ def change_password():
                 # Hash and update password using the new method from User model
                 user.set_password(new_password)
                 db.session.commit()
+                identity.invalidate_user(user.id)
                 flash('Your password has been changed successfully! Please log in again with your new password.', 'success')
                 logout_user() # Log user out for security after password change
                 return redirect(url_for('auth.login'))
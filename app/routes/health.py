@@ -0,0 +1,48 @@
+# app/routes/health.py
+
+from flask import Blueprint, current_app
+from app import db
+from app.services import migrations
+
+health_bp = Blueprint('health', __name__)
+
+
+@health_bp.route('/healthz')
+def healthz():
+    """
+    Liveness probe: the worker is up and answering. Touches nothing else, so a
+    database outage does not get healthy workers restarted.
+    """
+    return {'status': 'ok'}, 200
+
+
+@health_bp.route('/readyz')
+def readyz():
+    """
+    Readiness probe: every configured database (primary and replica) answers
+    SELECT 1 and the schema has no pending migrations. Returns 503 listing the
+    failed checks otherwise.
+    """
+    checks = {}
+    for key, engine in db.engines.items():
+        try:
+            with engine.connect() as conn:
+                conn.exec_driver_sql('SELECT 1')
+            checks[key or 'primary'] = 'ok'
+        except Exception as e:
+            checks[key or 'primary'] = f'unavailable ({e.__class__.__name__})'
+
+    # Applied migrations never go away, so once the schema is current stop checking
+    if not current_app.extensions.get('schema_ready') and checks.get('primary') == 'ok':
+        try:
+            waiting = migrations.pending()
+        except Exception as e:
+            checks['schema'] = f'unknown ({e.__class__.__name__})'
+        else:
+            if waiting:
+                checks['schema'] = f'{len(waiting)} pending migration(s)'
+            else:
+                current_app.extensions['schema_ready'] = True
+
+    ready = all(result == 'ok' for result in checks.values())
+    return {'status': 'ready' if ready else 'unavailable', 'checks': checks}, 200 if ready else 503
@@ -1,12 +1,21 @@
 # app/routes/moderator.py
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+import json
+from flask import Blueprint, Response, render_template, request, redirect, url_for, flash, abort, current_app, stream_with_context
 from flask_login import login_required, current_user
 from app import db
 # Ensure these imports match your actual models path
 from app.models.quiz import Quiz, Question, Contestant, ContestantAnswer
 from app.models.user import User, Role # Import User and Role models
 from app.routes.auth import role_required # Your custom role decorator
+from app.services import answers as answer_service
+from app.services import events
+from app.services import exporter
+from app.services import question_stats
+from app.services import identity
+from app.services.db_routing import read_replica
+from app.services import leaderboard
+from app.services import quiz_payload
 from datetime import datetime
 
 # Initialize the blueprint
@@ -17,19 +26,25 @@ moderator_bp = Blueprint('moderator', __name__)
 
 @moderator_bp.route('/dashboard')
 @role_required('moderator') # Assuming moderators/admins see this
+@read_replica
 def dashboard():
     """
     Displays the moderator dashboard with active and upcoming quizzes.
     """
-    # Filter for quizzes that are active (or considered upcoming/currently running)
-    quizzes_query = Quiz.query.filter(Quiz.is_active == True).order_by(Quiz.quiz_date.asc())
+    # Filter for quizzes that are active (or considered upcoming/currently running).
+    # Contestant totals are aggregated in the same query (COUNT ignores NULL submitted_at),
+    # so the page costs one round trip no matter how many quizzes or contestants exist.
+    quizzes_query = db.session.query(
+        Quiz,
+        db.func.count(Contestant.id).label('total_contestants'),
+        db.func.count(Contestant.submitted_at).label('completed_contestants')
+    ).outerjoin(Contestant, Contestant.quiz_id == Quiz.id) \
+     .filter(Quiz.is_active == True) \
+     .group_by(Quiz.id) \
+     .order_by(Quiz.quiz_date.asc())
 
     quizzes_for_display = []
-    for quiz in quizzes_query.all(): # Use .all() to execute the query
-        contestants = Contestant.query.filter_by(quiz_id=quiz.id).all()
-        total_contestants = len(contestants)
-        completed_contestants = sum(1 for c in contestants if c.submitted_at)
-
+    for quiz, total_contestants, completed_contestants in quizzes_query.all():
         # Determine current status based on actual time for upcoming/active
         if quiz.quiz_date > datetime.utcnow():
             quiz_status = 'Upcoming'
@@ -70,19 +85,94 @@ def quiz_session(quiz_id):
     Manages a live quiz session, displaying questions and contestant progress.
     """
     quiz = Quiz.query.get_or_404(quiz_id)
-    contestants = Contestant.query.filter_by(quiz_id=quiz_id).all()
-    questions = Question.query.filter_by(quiz_id=quiz_id).order_by(Question.id.asc()).all()
+    contestants = db.session.query(Contestant.id, Contestant.name, Contestant.score) \
+                            .filter(Contestant.quiz_id == quiz_id).all()
 
-    # Prepare data for the interactive session
+    # The page is a shell: questions are fetched a window at a time from
+    # quiz_questions, so its weight does not grow with the quiz. The question set
+    # is cached per quiz content version; only live scores are re-read.
+    question_ids = [q['id'] for q in quiz_payload.get_quiz_payload(quiz)['questions']]
     quiz_data = {
         'quiz_id': quiz.id,
         'title': quiz.title,
-        'questions': [{'id': q.id, 'text': q.question_text, 'options': {'a': q.option_a, 'b': q.option_b, 'c': q.option_c, 'd': q.option_d}, 'correct_answer': q.correct_answer} for q in questions],
-        'contestants': [{'id': c.id, 'name': c.name, 'score': c.score} for c in contestants]
+        'version': quiz.content_version,
+        'question_count': len(question_ids),
+        'window': current_app.config['QUIZ_SESSION_WINDOW'],
+        'contestants': [{'id': c.id, 'name': c.name, 'score': c.score} for c in contestants],
+        # Previously recorded answers, so a reloaded session resumes where it left off
+        'answer_matrix': answer_service.answer_matrix(quiz.id, question_ids)
     }
     return render_template('moderator/quiz_session.html', quiz_data=quiz_data)
 
 
+@moderator_bp.route('/quiz_session/<int:quiz_id>/questions')
+@role_required('moderator')
+def quiz_questions(quiz_id):
+    """
+    JSON window of a session's questions: ?start=<index>&count=<n>&v=<version>.
+    Responses carry an ETag per quiz content version and window; a request
+    naming the current version may be cached by the browser, since any edit
+    to the questions bumps the version and so changes the URL.
+    """
+    quiz = Quiz.query.get_or_404(quiz_id)
+    start = max(request.args.get('start', 0, type=int), 0)
+    count = min(max(request.args.get('count', current_app.config['QUIZ_SESSION_WINDOW'], type=int), 1), 50)
+
+    etag = quiz_payload.window_etag(quiz, start, count)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = current_app.json.response(quiz_payload.question_window(quiz, start, count))
+    response.set_etag(etag)
+    response.cache_control.private = True # Only moderators may see the answers
+    if request.args.get('v', type=int) == quiz.content_version:
+        response.cache_control.max_age = 86400
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+
+@moderator_bp.route('/quiz_session/<int:quiz_id>/answers')
+@role_required('moderator')
+def quiz_answers(quiz_id):
+    """
+    JSON answer matrix for a quiz session: question ids in session order and one
+    string per contestant with the selected option per question ('-' if none).
+    """
+    quiz = Quiz.query.get_or_404(quiz_id)
+    question_ids = [q['id'] for q in quiz_payload.get_quiz_payload(quiz)['questions']]
+    return answer_service.answer_matrix(quiz.id, question_ids)
+
+
+@moderator_bp.route('/quiz_session/<int:quiz_id>/events')
+@role_required('moderator')
+def quiz_events(quiz_id):
+    """
+    Server-Sent Events stream of score and completion deltas for a quiz, so every
+    open session screen stays current without polling or reloading.
+    """
+    if not db.session.query(Quiz.id).filter_by(id=quiz_id).first():
+        abort(404)
+
+    subscription = events.get_broker().subscribe(events.quiz_channel(quiz_id))
+    keepalive = current_app.config['SSE_KEEPALIVE_SECONDS']
+
+    def stream():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                event = subscription.get(timeout=keepalive)
+                if event is None:
+                    yield ': keepalive\n\n' # Comment line keeps proxies from closing an idle stream
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            subscription.close()
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 @moderator_bp.route('/record_answer', methods=['POST'])
 @role_required('moderator')
 def record_answer():
@@ -90,51 +180,75 @@ def record_answer():
     AJAX endpoint to record a contestant's answer and update their score.
     """
     data = request.json
+    if not isinstance(data, dict):
+        return {'status': 'error', 'message': 'Expected a JSON object.'}, 400
     contestant_id = data.get('contestant_id')
     question_id = data.get('question_id')
     selected_option = data.get('selected_option')
     quiz_id = data.get('quiz_id') # This quiz_id might not be strictly needed here if question_id is unique enough
 
-    question = Question.query.get(question_id)
-    contestant = Contestant.query.get(contestant_id)
-
-    if not question or not contestant:
-        return {'status': 'error', 'message': 'Invalid contestant or question.'}, 400
+    # Grading, the conflict-safe answer upsert and the atomic score increment
+    # are shared with the batch endpoint.
+    try:
+        new_scores = answer_service.record_answers([{
+            'contestant_id': contestant_id,
+            'question_id': question_id,
+            'selected_option': selected_option
+        }])
+        db.session.commit()
+    except ValueError as e:
+        db.session.rollback()
+        return {'status': 'error', 'message': str(e)}, 400
+    except Exception as e:
+        db.session.rollback()
+        return {'status': 'error', 'message': f'Database error: {str(e)}'}, 500
 
-    is_correct = (selected_option == question.correct_answer)
+    _publish_scores(new_scores)
+    return {'status': 'success', 'message': 'Answer recorded.', 'new_score': new_scores[int(contestant_id)].score}, 200
 
-    contestant_answer = ContestantAnswer.query.filter_by(
-        contestant_id=contestant_id,
-        question_id=question_id
-    ).first()
 
-    if contestant_answer:
-        # If the answer changes, adjust the score accordingly
-        if contestant_answer.is_correct and not is_correct:
-            contestant.score -= 1
-        elif not contestant_answer.is_correct and is_correct:
-            contestant.score += 1
-        contestant_answer.selected_option = selected_option
-        contestant_answer.is_correct = is_correct
-    else:
-        # Create new answer
-        new_answer = ContestantAnswer(
-            contestant_id=contestant_id,
-            question_id=question_id,
-            selected_option=selected_option,
-            is_correct=is_correct
-        )
-        db.session.add(new_answer)
-        if is_correct:
-            contestant.score += 1
+@moderator_bp.route('/record_answers', methods=['POST'])
+@role_required('moderator')
+def record_answers():
+    """
+    AJAX endpoint to record a batch of answers (e.g. a whole row of contestants)
+    in one transaction. Expects {'answers': [{'contestant_id', 'question_id',
+    'selected_option'}, ...]} and returns the new score of every contestant touched.
+    """
+    data = request.json
+    if not isinstance(data, dict):
+        return {'status': 'error', 'message': 'Expected a JSON object.'}, 400
+    entries = data.get('answers')
+    if entries is None or entries == []:
+        return {'status': 'error', 'message': 'No answers provided.'}, 400
+    if not isinstance(entries, list):
+        return {'status': 'error', 'message': 'answers must be a list.'}, 400
 
     try:
+        new_scores = answer_service.record_answers(entries)
         db.session.commit()
-        return {'status': 'success', 'message': 'Answer recorded.', 'new_score': contestant.score}, 200
+    except ValueError as e:
+        db.session.rollback()
+        return {'status': 'error', 'message': str(e)}, 400
     except Exception as e:
         db.session.rollback()
         return {'status': 'error', 'message': f'Database error: {str(e)}'}, 500
 
+    _publish_scores(new_scores)
+    return {
+        'status': 'success',
+        'message': f'{len(entries)} answers recorded.',
+        'new_scores': {str(contestant_id): row.score for contestant_id, row in new_scores.items()}
+    }, 200
+
+
+def _publish_scores(new_scores):
+    """Pushes committed score changes to every screen watching the affected quizzes."""
+    boards = leaderboard.get_store()
+    for contestant_id, row in new_scores.items():
+        boards.apply_score(row.quiz_id, contestant_id, row.score)
+        events.publish_quiz_event(row.quiz_id, 'score', contestant_id=contestant_id, score=row.score)
+
 
 @moderator_bp.route('/submit_quiz_completion', methods=['POST'])
 @role_required('moderator')
@@ -154,6 +268,8 @@ def submit_quiz_completion():
 
     try:
         db.session.commit()
+        leaderboard.get_store().mark_completed(contestant.quiz_id, contestant.id)
+        events.publish_quiz_event(contestant.quiz_id, 'completed', contestant_id=contestant.id)
         flash(f"Quiz for {contestant.name} marked as complete!", 'success')
         # Return the quiz_id to the frontend for redirection
         return {'status': 'success', 'message': 'Quiz marked complete.', 'quiz_id': contestant.quiz_id}, 200
@@ -164,6 +280,7 @@ def submit_quiz_completion():
 
 @moderator_bp.route('/quiz_results/<int:quiz_id>')
 @role_required('moderator')
+@read_replica
 def quiz_results(quiz_id):
     """
     Displays the final results for a specific quiz, listing all contestants
@@ -171,50 +288,83 @@ def quiz_results(quiz_id):
     """
     quiz = Quiz.query.get_or_404(quiz_id)
 
-    # Get all questions for this quiz to count the total possible score
-    questions = Question.query.filter_by(quiz_id=quiz_id).all()
-    total_questions_count = len(questions)
+    # Count the questions for this quiz (the total possible score) without loading them
+    total_questions_count = db.session.query(db.func.count(Question.id)) \
+                                      .filter(Question.quiz_id == quiz_id).scalar()
 
-    # Fetch contestants, ordered by score (descending) for ranking
-    contestants = Contestant.query.filter_by(quiz_id=quiz_id).order_by(Contestant.score.desc()).all()
+    # Ranks come from the quiz's leaderboard, which is kept current as answers are
+    # recorded, so a refresh only slices the requested page out of it.
+    per_page = min(max(request.args.get('per_page', 50, type=int), 1), 500)
+    board = leaderboard.get_store().get(quiz_id)
+    total_pages = max((len(board) + per_page - 1) // per_page, 1)
+    page = min(max(request.args.get('page', 1, type=int), 1), total_pages)
+    results_for_display = board.slice((page - 1) * per_page, per_page)
 
-    # Prepare data list to pass to the template with all necessary fields
-    results_for_display = []
+    return render_template('moderator/quiz_results.html', # This template path remains here as it's for quiz results
+                           quiz=quiz,
+                           results=results_for_display, # Pass the enriched list here
+                           total_questions_count=total_questions_count,
+                           page=page,
+                           per_page=per_page,
+                           total_pages=total_pages)
 
-    # Track previous score for ranking tie-breaking
-    previous_score = None
-    rank = 0
-    tied_rank = 1 # Keep track of the rank for tied scores
 
-    for i, contestant in enumerate(contestants):
-        # Calculate rank
-        if contestant.score != previous_score:
-            rank = i + 1
-            tied_rank = rank
-        else:
-            rank = tied_rank # Maintain rank for ties
+@moderator_bp.route('/quiz_results/<int:quiz_id>/standings')
+@role_required('moderator')
+@read_replica
+def quiz_standings(quiz_id):
+    """
+    JSON view of a quiz's leaderboard: the top N (or a slice via offset/limit),
+    plus the rank of a single contestant when contestant_id is given.
+    """
+    if not db.session.query(Quiz.id).filter_by(id=quiz_id).first():
+        abort(404)
 
-        previous_score = contestant.score
+    board = leaderboard.get_store().get(quiz_id)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 500)
+    response = {'quiz_id': quiz_id, 'total': len(board), 'standings': board.slice(offset, limit)}
 
-        # Determine status
-        status = "Completed" if contestant.submitted_at else "In Progress"
+    contestant_id = request.args.get('contestant_id', type=int)
+    if contestant_id is not None:
+        response['contestant'] = {'contestant_id': contestant_id, 'rank': board.rank_of(contestant_id)}
+    return response
 
-        results_for_display.append({
-            'rank': rank,
-            'name': contestant.name,
-            'score': contestant.score,
-            'status': status
-        })
 
-    return render_template('moderator/quiz_results.html', # This template path remains here as it's for quiz results
-                           quiz=quiz,
-                           results=results_for_display, # Pass the enriched list here
-                           total_questions_count=total_questions_count)
+@moderator_bp.route('/quiz_results/<int:quiz_id>/export')
+@role_required('moderator', 'admin', 'superadmin')
+def export_results(quiz_id):
+    """
+    Streams a quiz's results as CSV or JSONL (?format=csv|jsonl). With ?answers=1
+    every recorded answer is included, one row per contestant answer.
+    """
+    quiz = Quiz.query.get_or_404(quiz_id)
+    fmt = request.args.get('format', 'csv')
+    if fmt not in exporter.EXPORT_FORMATS:
+        abort(400)
+    include_answers = request.args.get('answers') in ('1', 'true', 'yes')
+
+    filename = f"quiz_{quiz.id}_{'answers' if include_answers else 'results'}.{fmt}"
+    chunks = exporter.iter_export(quiz.id, fmt=fmt, include_answers=include_answers)
+    return Response(stream_with_context(chunks), mimetype=exporter.EXPORT_FORMATS[fmt],
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+@moderator_bp.route('/quiz_results/<int:quiz_id>/item_analysis')
+@role_required('moderator', 'admin', 'superadmin')
+@read_replica
+def item_analysis(quiz_id):
+    """
+    Per-question difficulty and option distribution, read from the counters
+    the answers service maintains, so the page does not scan the answers.
+    """
+    quiz = Quiz.query.get_or_404(quiz_id)
+    return render_template('moderator/item_analysis.html', quiz=quiz, items=question_stats.item_analysis(quiz.id))
 
 # --- SUPERADMIN PANEL ROUTES START ---
 
 @moderator_bp.route('/manage_admins')
 @role_required('superadmin')
+@read_replica
 def manage_admins():
     """
     Superadmin dashboard to list and manage admin/moderator accounts.
@@ -317,6 +467,7 @@ def edit_admin(user_id):
         user_to_edit.is_active = new_is_active
 
         db.session.commit()
+        identity.invalidate_user(user_id)
         flash(f'User "{user_to_edit.username}" updated successfully.', 'success')
         return redirect(url_for('moderator.manage_admins'))
 
@@ -344,6 +495,7 @@ def toggle_admin_status(user_id):
 
     user_to_toggle.is_active = not user_to_toggle.is_active
     db.session.commit()
+    identity.invalidate_user(user_id)
     status_msg = "enabled" if user_to_toggle.is_active else "disabled"
     flash(f'User "{user_to_toggle.username}" has been {status_msg}.', 'info')
     return redirect(url_for('moderator.manage_admins'))
@@ -375,6 +527,7 @@ def change_admin_password(user_id):
 
         user_to_change_pw.set_password(new_password) # Use the hashing method
         db.session.commit()
+        identity.invalidate_user(user_id)
         flash(f'Password for user "{user_to_change_pw.username}" has been changed.', 'success')
         return redirect(url_for('moderator.manage_admins'))
 
@@ -401,6 +554,7 @@ def delete_admin(user_id):
 
     db.session.delete(user_to_delete)
     db.session.commit()
+    identity.invalidate_user(user_id)
     flash(f'User "{user_to_delete.username}" deleted successfully.', 'success')
     return redirect(url_for('moderator.manage_admins'))
 
@@ -0,0 +1,207 @@
+# app/services/answers.py
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.quiz import Question, Contestant, ContestantAnswer
+from app.services import question_stats
+
+VALID_OPTIONS = ('a', 'b', 'c', 'd')
+
+
+def _normalize(entries):
+    """
+    Validates the raw answer dicts and collapses repeated (contestant, question)
+    pairs so the last submitted option wins, like sequential single posts would.
+    """
+    answers = {}
+    for entry in entries:
+        try:
+            contestant_id = int(entry['contestant_id'])
+            question_id = int(entry['question_id'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('Each answer needs a contestant_id and question_id.')
+        selected_option = entry.get('selected_option')
+        if selected_option not in VALID_OPTIONS:
+            raise ValueError(f'Invalid option {selected_option!r} for question {question_id}.')
+        answers[(contestant_id, question_id)] = selected_option
+    return answers
+
+
+def record_answers(entries):
+    """
+    Grades a batch of answers in memory and stores them with a handful of
+    set-based statements instead of one round trip per answer.
+
+    Safe under concurrent moderators: new rows go through the (contestant_id,
+    question_id) unique constraint with ON CONFLICT DO NOTHING, existing rows are
+    locked before their old values are read, and scores and per-question
+    counters move by in-database increments derived from the old/new values.
+
+    Does not commit; the caller owns the transaction.
+    Returns {contestant_id: row} for every contestant in the batch, where each
+    row carries the contestant's quiz_id and new score.
+    Raises ValueError when the batch references unknown or mismatched rows.
+    """
+    answers = _normalize(entries)
+    if not answers:
+        return {}
+
+    contestant_ids = {cid for cid, _ in answers}
+    question_ids = {qid for _, qid in answers}
+
+    questions = {
+        q.id: q for q in db.session.query(Question.id, Question.quiz_id, Question.correct_answer)
+                                   .filter(Question.id.in_(question_ids))
+    }
+    contestant_quiz = dict(
+        db.session.query(Contestant.id, Contestant.quiz_id).filter(Contestant.id.in_(contestant_ids))
+    )
+
+    for contestant_id, question_id in answers:
+        question = questions.get(question_id)
+        if question is None or contestant_id not in contestant_quiz:
+            raise ValueError('Invalid contestant or question.')
+        if contestant_quiz[contestant_id] != question.quiz_id:
+            raise ValueError(f'Contestant {contestant_id} is not registered for the quiz of question {question_id}.')
+
+    graded = {
+        pair: (selected_option, selected_option == questions[pair[1]].correct_answer)
+        for pair, selected_option in answers.items()
+    }
+
+    inserted = _insert_new(graded)
+    changes = [(pair, None, graded[pair]) for pair in inserted]
+    existing = [pair for pair in graded if pair not in inserted]
+    if existing:
+        changes.extend(_update_existing(existing, graded))
+
+    score_deltas = {}
+    for (contestant_id, _), old, new in changes:
+        delta = int(new[1]) - int(bool(old and old[1]))
+        if delta:
+            score_deltas[contestant_id] = score_deltas.get(contestant_id, 0) + delta
+    score_deltas = {cid: delta for cid, delta in score_deltas.items() if delta}
+    if score_deltas:
+        db.session.execute(
+            db.update(Contestant)
+              .where(Contestant.id.in_(score_deltas))
+              .values(score=db.func.coalesce(Contestant.score, 0) + db.case(score_deltas, value=Contestant.id, else_=0))
+              .execution_options(synchronize_session=False)
+        )
+    question_stats.apply_deltas(question_stats.deltas_for(changes))
+
+    return {
+        row.id: row for row in db.session.query(Contestant.id, Contestant.quiz_id, Contestant.score)
+                                         .filter(Contestant.id.in_(contestant_ids))
+    }
+
+
+def _dialect():
+    return db.session.get_bind(mapper=ContestantAnswer).dialect
+
+
+def _insert_new(graded):
+    """
+    Inserts every graded answer that has no stored row yet, leaving rows that
+    already exist (or that a concurrent writer inserts first) untouched.
+    Returns the set of (contestant_id, question_id) pairs this call inserted.
+    """
+    rows = [
+        {'contestant_id': cid, 'question_id': qid, 'selected_option': option, 'is_correct': is_correct}
+        for (cid, qid), (option, is_correct) in sorted(graded.items()) # Stable lock order
+    ]
+    dialect = _dialect().name
+
+    if dialect in ('postgresql', 'sqlite'):
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = insert(ContestantAnswer).values(rows) \
+            .on_conflict_do_nothing(index_elements=[ContestantAnswer.contestant_id, ContestantAnswer.question_id]) \
+            .returning(ContestantAnswer.contestant_id, ContestantAnswer.question_id)
+        return {(row.contestant_id, row.question_id) for row in db.session.execute(stmt)}
+
+    inserted = set()
+    for row in rows:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(db.insert(ContestantAnswer), row)
+            inserted.add((row['contestant_id'], row['question_id']))
+        except IntegrityError:
+            pass
+    return inserted
+
+
+def _update_existing(pairs, graded):
+    """
+    Applies graded answers to rows that already exist and returns the changes
+    as (pair, (old_option, old_is_correct), (new_option, new_is_correct)).
+
+    The current rows are read with FOR UPDATE (in key order), so a concurrent
+    moderator changing the same answer waits and then sees the value it
+    replaces. SQLite has no row locks, but by now the batch's INSERT holds its
+    database-wide write lock, which serializes writers the same way. Unchanged
+    answers are skipped; the rest cost one UPDATE per (option, is_correct) group.
+    """
+    current = db.session.execute(locked_answers_query(pairs))
+
+    changes = []
+    groups = {}
+    for contestant_id, question_id, old_option, old_correct in current:
+        pair = (contestant_id, question_id)
+        old, new = (old_option, bool(old_correct)), graded[pair]
+        if old != new:
+            changes.append((pair, old, new))
+            groups.setdefault(new, []).append(pair)
+
+    for (option, is_correct), group in groups.items():
+        db.session.execute(update_answers_query(group, option, is_correct))
+    return changes
+
+
+def _answer_key():
+    return db.tuple_(ContestantAnswer.contestant_id, ContestantAnswer.question_id)
+
+
+def locked_answers_query(pairs):
+    """The stored rows for (contestant_id, question_id) pairs, locked in key order."""
+    return db.select(ContestantAnswer.contestant_id, ContestantAnswer.question_id,
+                     ContestantAnswer.selected_option, db.func.coalesce(ContestantAnswer.is_correct, False)) \
+             .where(_answer_key().in_(pairs)) \
+             .order_by(ContestantAnswer.contestant_id, ContestantAnswer.question_id) \
+             .with_for_update()
+
+
+def update_answers_query(pairs, option, is_correct):
+    """Sets one (option, is_correct) value on the rows for (contestant_id, question_id) pairs."""
+    return db.update(ContestantAnswer) \
+             .where(_answer_key().in_(pairs)) \
+             .values(selected_option=option, is_correct=is_correct) \
+             .execution_options(synchronize_session=False)
+
+
+def answer_matrix(quiz_id, question_ids):
+    """
+    Loads every stored answer for a quiz in one query and encodes it compactly:
+    one string per contestant holding a single option character per question,
+    in question_ids order, with '-' for unanswered questions.
+
+    Returns {'question_ids': [...], 'rows': {contestant_id: 'ab-c', ...}}.
+    """
+    position = {question_id: i for i, question_id in enumerate(question_ids)}
+    rows = {}
+    answers = db.session.query(ContestantAnswer.contestant_id, ContestantAnswer.question_id,
+                               ContestantAnswer.selected_option) \
+                        .join(Contestant, Contestant.id == ContestantAnswer.contestant_id) \
+                        .filter(Contestant.quiz_id == quiz_id)
+    for contestant_id, question_id, selected_option in answers:
+        index = position.get(question_id)
+        if index is None:
+            continue
+        cells = rows.get(contestant_id)
+        if cells is None:
+            cells = rows[contestant_id] = ['-'] * len(question_ids)
+        cells[index] = selected_option
+    return {
+        'question_ids': list(question_ids),
+        'rows': {str(contestant_id): ''.join(cells) for contestant_id, cells in rows.items()}
+    }
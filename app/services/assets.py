@@ -0,0 +1,136 @@
+# app/services/assets.py
+
+import os
+import re
+import gzip
+import json
+import shutil
+import hashlib
+import mimetypes
+from flask import abort, current_app, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError: # Optional: without it only gzip variants are built
+    brotli = None
+
+# The files pages actually load; source maps stay in static/ for development
+ASSETS = (
+    'css/bootstrap.min.css',
+    'js/jquery.min.js',
+    'js/bootstrap.bundle.min.js', # Includes Popper
+)
+DIST_DIR = 'dist'
+MANIFEST = 'manifest.json'
+CACHE_SECONDS = 365 * 24 * 3600
+# Variants by preference; the browser's Accept-Encoding decides which it gets
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Fingerprinted copies are not shipped with their maps
+_SOURCE_MAP = re.compile(rb'\n?/[/*]# sourceMappingURL=\S+(?: \*/)?\s*$')
+
+
+def _fingerprinted(name, content):
+    root, ext = os.path.splitext(name)
+    return f'{root}.{hashlib.sha256(content).hexdigest()[:12]}{ext}'
+
+
+def build(static_folder, assets=ASSETS, echo=print):
+    """
+    Writes a content-hashed copy of each asset to static/dist with .gz (and,
+    when the brotli package is installed, .br) variants next to it, plus a
+    manifest mapping the logical names to the hashed ones. Earlier builds are
+    removed. Returns the manifest.
+    """
+    dist = os.path.join(static_folder, DIST_DIR)
+    if os.path.isdir(dist):
+        shutil.rmtree(dist)
+
+    manifest = {}
+    for name in assets:
+        with open(os.path.join(static_folder, name), 'rb') as f:
+            content = _SOURCE_MAP.sub(b'\n', f.read())
+        hashed = _fingerprinted(name, content)
+        path = os.path.join(dist, hashed)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        variants = {'': content, '.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(content, quality=11)
+        for suffix, data in variants.items():
+            with open(path + suffix, 'wb') as f:
+                f.write(data)
+        manifest[name] = hashed
+        echo(f'{name} -> {DIST_DIR}/{hashed} ' +
+             ' '.join(f'{suffix or "raw"} {len(data):,}B' for suffix, data in variants.items()))
+
+    with open(os.path.join(dist, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    if brotli is None:
+        echo('brotli is not installed; built gzip variants only.')
+    return manifest
+
+
+def _load_manifest(static_folder):
+    try:
+        with open(os.path.join(static_folder, DIST_DIR, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def init_app(app):
+    """
+    Reads the build manifest once at startup and registers asset_url() for
+    templates and the /assets route that serves the built files. Without a
+    build, asset_url() falls back to the plain static URL so a fresh checkout
+    works unchanged; run `flask assets build` after changing static files.
+    """
+    app.extensions['asset_manifest'] = _load_manifest(app.static_folder)
+    app.add_url_rule('/assets/<path:filename>', 'assets', serve_asset)
+    app.jinja_env.globals['asset_url'] = asset_url
+
+
+def asset_url(filename):
+    hashed = current_app.extensions['asset_manifest'].get(filename)
+    if hashed is None:
+        return url_for('static', filename=filename)
+    return url_for('assets', filename=hashed)
+
+
+def _pick_encoding(dist, filename):
+    """
+    The built variant the client ranks highest, as (encoding, suffix); ties go
+    to the order of ENCODINGS. Encodings given q=0 are refused, and (None, '')
+    means the uncompressed file, which also wins when the client ranks identity
+    above every available variant.
+    """
+    best, best_quality = (None, ''), 0
+    for encoding, suffix in ENCODINGS:
+        quality = request.accept_encodings.quality(encoding)
+        if quality > best_quality and os.path.exists(os.path.join(dist, filename + suffix)):
+            best, best_quality = (encoding, suffix), quality
+    if best_quality < request.accept_encodings.quality('identity'):
+        return None, ''
+    return best
+
+
+def serve_asset(filename):
+    """
+    Serves a fingerprinted file, precompressed when the client accepts it. The
+    name changes whenever the content does, so responses are cacheable forever.
+    """
+    if filename not in current_app.extensions['asset_manifest'].values():
+        abort(404)
+    dist = os.path.join(current_app.static_folder, DIST_DIR)
+
+    encoding, suffix = _pick_encoding(dist, filename)
+
+    response = send_from_directory(dist, filename + suffix, mimetype=mimetypes.guess_type(filename)[0],
+                                   max_age=CACHE_SECONDS)
+    if encoding:
+        response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
@@ -0,0 +1,82 @@
+# app/services/dashboard_stats.py
+
+from datetime import datetime
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from app import db
+from app.models.user import User
+from app.models.quiz import Quiz, Contestant
+from app.services.cache import TTLCache
+from app.services.db_routing import RoutingSession
+
+UPCOMING_LIMIT = 5
+_UPCOMING_PREFETCH = 20 # Spare rows so the list stays full as cached quizzes start
+_KEY = 'admin_dashboard'
+_COUNTED = (Quiz, User, Contestant)
+
+
+def init_app(app):
+    app.extensions['dashboard_stats'] = TTLCache(maxsize=1, ttl=app.config.get('DASHBOARD_STATS_TTL_SECONDS', 60))
+    if not event.contains(RoutingSession, 'after_flush', _note_changes):
+        event.listen(RoutingSession, 'after_flush', _note_changes)
+        event.listen(RoutingSession, 'after_commit', _invalidate_on_commit)
+        event.listen(RoutingSession, 'after_soft_rollback', _forget_changes)
+
+
+def _cache():
+    return current_app.extensions['dashboard_stats']
+
+
+def _build():
+    upcoming = db.session.query(Quiz.id, Quiz.title, Quiz.description, Quiz.quiz_date) \
+                         .filter(Quiz.quiz_date > datetime.now()) \
+                         .order_by(Quiz.quiz_date.asc()) \
+                         .limit(_UPCOMING_PREFETCH).all()
+    return {
+        'total_quizzes': db.session.query(db.func.count(Quiz.id)).scalar(),
+        'total_users': db.session.query(db.func.count(User.id)).scalar(),
+        'total_contestants': db.session.query(db.func.count(Contestant.id)).scalar(),
+        'upcoming_quizzes': [row._asdict() for row in upcoming]
+    }
+
+
+def get_admin_stats():
+    """
+    Returns the admin dashboard's totals and upcoming quizzes.
+
+    The counts are computed at most once per TTL per process and dropped as soon
+    as this process commits a change to quizzes, users or contestants, so the
+    dashboard usually costs no queries at all. Other processes see a change
+    within DASHBOARD_STATS_TTL_SECONDS.
+    """
+    stats = _cache().get_or_set(_KEY, _build)
+    now = datetime.now()
+    upcoming = [quiz for quiz in stats['upcoming_quizzes'] if quiz['quiz_date'] > now]
+    if len(upcoming) < UPCOMING_LIMIT and len(stats['upcoming_quizzes']) == _UPCOMING_PREFETCH:
+        # Enough of the prefetched quizzes have started that later ones may be missing
+        invalidate()
+        return get_admin_stats()
+    return dict(stats, upcoming_quizzes=upcoming[:UPCOMING_LIMIT])
+
+
+def invalidate():
+    """Drops the cached statistics. Bulk writes that bypass the ORM session must call this."""
+    _cache().clear()
+
+
+def _note_changes(session, flush_context):
+    # Inserts and deletes move the counts; only quiz edits change the upcoming list
+    changed = any(isinstance(i, _COUNTED) for i in (*session.new, *session.deleted)) or \
+        any(isinstance(i, Quiz) for i in session.dirty)
+    if changed:
+        session.info['dashboard_stats_stale'] = True
+
+
+def _invalidate_on_commit(session):
+    if session.info.pop('dashboard_stats_stale', False) and has_app_context():
+        invalidate()
+
+
+def _forget_changes(session, previous_transaction):
+    if not previous_transaction.nested: # A savepoint rollback leaves the outer changes pending
+        session.info.pop('dashboard_stats_stale', None)
@@ -0,0 +1,37 @@
+# app/services/db_routing.py
+
+import functools
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND_KEY = 'replica'
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads issued inside @read_replica views to the 'replica'
+    bind when one is configured. Flushes and INSERT/UPDATE/DELETE statements
+    always go to the primary, and without a replica bind nothing changes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context() and g.get('use_replica'):
+            replica = self._db.engines.get(REPLICA_BIND_KEY)
+            if replica is not None and not getattr(clause, 'is_dml', False):
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_replica(fn):
+    """
+    Marks a read-only view whose queries may be served by the read replica.
+    Apply it below the auth decorators so the user lookup stays on the primary.
+    """
+    @functools.wraps(fn)
+    def decorated_view(*args, **kwargs):
+        g.use_replica = True
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            g.use_replica = False
+    return decorated_view
@@ -0,0 +1,108 @@
+# app/services/events.py
+
+import queue
+import threading
+from flask import current_app
+from werkzeug.utils import import_string
+
+
+class Subscription:
+    """
+    One listener's view of a channel. Events are buffered in a bounded queue;
+    when a slow consumer falls behind, the oldest events are dropped so the
+    publisher never blocks.
+    """
+
+    def __init__(self, broker, channel, max_pending):
+        self.broker = broker
+        self.channel = channel
+        self._queue = queue.Queue(maxsize=max_pending)
+
+    def put(self, event):
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """Returns the next event, or None if nothing arrived within timeout."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """
+    Fan-out pub/sub within a single process. Publishing costs one queue put per
+    open subscriber. Deployments running several worker processes can swap in a
+    broker backed by a local message server through the EVENT_BROKER setting;
+    it only needs the same publish/subscribe/unsubscribe interface.
+    """
+
+    # Events never leave the publishing process; see reaches_all_workers()
+    process_local = True
+
+    def __init__(self, app=None):
+        self.max_pending = 256
+        self._channels = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.max_pending = app.config.get('EVENT_MAX_PENDING', self.max_pending)
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel, self.max_pending)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(event)
+
+
+def init_app(app):
+    broker_class = app.config.get('EVENT_BROKER') or InProcessBroker
+    if isinstance(broker_class, str):
+        broker_class = import_string(broker_class)
+    app.extensions['event_broker'] = broker_class(app)
+
+
+def get_broker():
+    return current_app.extensions['event_broker']
+
+
+def reaches_all_workers(app):
+    """
+    Whether events published in one worker process reach subscribers in the
+    others. False for the in-process broker, so serving with several worker
+    processes would leave most live session screens without updates.
+    """
+    return not getattr(app.extensions['event_broker'], 'process_local', False)
+
+
+def quiz_channel(quiz_id):
+    return f'quiz:{quiz_id}'
+
+
+def publish_quiz_event(quiz_id, event_type, **data):
+    """Pushes a delta to everyone watching the given quiz."""
+    get_broker().publish(quiz_channel(quiz_id), dict(data, type=event_type))
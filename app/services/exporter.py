@@ -0,0 +1,90 @@
+# app/services/exporter.py
+
+import io
+import csv
+import json
+from app import db
+from app.models.quiz import Contestant, ContestantAnswer
+
+RESULT_FIELDS = ('rank', 'contestant_id', 'name', 'email', 'score', 'status', 'submitted_at')
+ANSWER_FIELDS = ('question_id', 'selected_option', 'is_correct', 'answered_at')
+EXPORT_FORMATS = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+def _iter_rows(quiz_id, include_answers, chunk_size):
+    """
+    Yields one dict per contestant (or per contestant answer when include_answers
+    is set) in rank order. Rows come from a server-side cursor (yield_per), and
+    ranks are computed on the fly, so memory does not grow with the quiz.
+    """
+    columns = [Contestant.id, Contestant.name, Contestant.email, Contestant.score, Contestant.submitted_at]
+    stmt = db.select(*columns)
+    if include_answers:
+        stmt = db.select(*columns, ContestantAnswer.question_id, ContestantAnswer.selected_option,
+                         ContestantAnswer.is_correct, ContestantAnswer.created_at) \
+                 .outerjoin(ContestantAnswer, ContestantAnswer.contestant_id == Contestant.id)
+    stmt = stmt.where(Contestant.quiz_id == quiz_id) \
+               .order_by(Contestant.score.desc(), Contestant.id.asc())
+    if include_answers:
+        stmt = stmt.order_by(ContestantAnswer.question_id.asc())
+
+    rows = db.session.execute(stmt.execution_options(yield_per=chunk_size))
+    position, rank, previous_score, previous_contestant = 0, 0, None, None
+    for row in rows:
+        if row.id != previous_contestant:
+            # Tied scores share a rank, as on the results page (1, 2, 2, 4)
+            position += 1
+            if row.score != previous_score:
+                rank = position
+            previous_score, previous_contestant = row.score, row.id
+        record = {
+            'rank': rank,
+            'contestant_id': row.id,
+            'name': row.name,
+            'email': row.email,
+            'score': row.score,
+            'status': 'Completed' if row.submitted_at else 'In Progress',
+            'submitted_at': _isoformat(row.submitted_at)
+        }
+        if include_answers:
+            record.update({
+                'question_id': row.question_id,
+                'selected_option': row.selected_option,
+                'is_correct': row.is_correct,
+                'answered_at': _isoformat(row.created_at)
+            })
+        yield record
+
+
+def iter_export(quiz_id, fmt='csv', include_answers=False, chunk_size=1000):
+    """
+    Yields the export as text chunks of up to chunk_size rows, ready to be
+    written to a file or sent as a chunked HTTP response.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError('Unsupported export format. Use csv or jsonl.')
+
+    fields = RESULT_FIELDS + (ANSWER_FIELDS if include_answers else ())
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields) if fmt == 'csv' else None
+    if writer:
+        writer.writeheader()
+
+    pending = 0
+    for record in _iter_rows(quiz_id, include_answers, chunk_size):
+        if writer:
+            writer.writerow(record)
+        else:
+            buffer.write(json.dumps(record) + '\n')
+        pending += 1
+        if pending >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
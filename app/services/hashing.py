@@ -0,0 +1,120 @@
+# app/services/hashing.py
+
+import os
+import time
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt
+from flask import current_app
+
+
+def _prepare(password, handle_long_passwords):
+    # Same input handling as Flask-Bcrypt, so existing hashes keep verifying
+    if isinstance(password, str):
+        password = password.encode('utf-8')
+    if handle_long_passwords:
+        password = hashlib.sha256(password).hexdigest().encode('utf-8')
+    return password
+
+
+def _hash_in_worker(password, rounds, handle_long_passwords):
+    return bcrypt.hashpw(_prepare(password, handle_long_passwords), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+
+def _check_in_worker(pw_hash, password, handle_long_passwords):
+    return bcrypt.checkpw(_prepare(password, handle_long_passwords), pw_hash.encode('utf-8'))
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a bounded pool of worker processes so CPU-bound hashing during
+    a login burst does not hold the request threads' GIL. At most max_pending
+    hashes are queued; further callers wait for a slot instead of piling work
+    onto the pool. With workers set to 0 hashing runs inline.
+
+    Workers are started with the spawn method (forking a threaded server is
+    unsafe), so the launching script's top level must be import-safe.
+    """
+
+    def __init__(self, rounds=12, workers=2, max_pending=32, handle_long_passwords=False):
+        self.rounds = rounds
+        self.workers = workers
+        self.handle_long_passwords = handle_long_passwords
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+        self._pending = 0
+        self._stats = {
+            'hash': {'count': 0, 'seconds_total': 0.0, 'seconds_max': 0.0},
+            'check': {'count': 0, 'seconds_total': 0.0, 'seconds_max': 0.0}
+        }
+
+    def _get_executor(self):
+        # Pools do not survive fork; a preforked worker builds its own on first use
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _run(self, kind, fn, *args):
+        with self._slots:
+            with self._lock:
+                self._pending += 1
+            started = time.perf_counter()
+            try:
+                if self.workers > 0:
+                    return self._get_executor().submit(fn, *args).result()
+                return fn(*args)
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self._pending -= 1
+                    stats = self._stats[kind]
+                    stats['count'] += 1
+                    stats['seconds_total'] += elapsed
+                    stats['seconds_max'] = max(stats['seconds_max'], elapsed)
+
+    def hash_password(self, password):
+        if not password:
+            raise ValueError('Password must be non-empty.')
+        return self._run('hash', _hash_in_worker, password, self.rounds, self.handle_long_passwords)
+
+    def check_password(self, pw_hash, password):
+        if not pw_hash or not password:
+            return False
+        return self._run('check', _check_in_worker, pw_hash, password, self.handle_long_passwords)
+
+    def needs_rehash(self, pw_hash):
+        """True when a stored hash was made with a different cost factor than configured."""
+        try:
+            return int(pw_hash.split('$')[2]) != self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return True
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'queue_depth': self._pending,
+                'workers': self.workers,
+                'rounds': self.rounds,
+                'hash': dict(self._stats['hash']),
+                'check': dict(self._stats['check'])
+            }
+
+
+def init_app(app):
+    app.extensions['password_hasher'] = PasswordHasher(
+        rounds=app.config.get('BCRYPT_LOG_ROUNDS', 12),
+        workers=app.config.get('PASSWORD_HASH_WORKERS', 2),
+        max_pending=app.config.get('PASSWORD_HASH_MAX_PENDING', 32),
+        handle_long_passwords=app.config.get('BCRYPT_HANDLE_LONG_PASSWORDS', False)
+    )
+
+
+def get_hasher():
+    return current_app.extensions['password_hasher']
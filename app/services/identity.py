@@ -0,0 +1,56 @@
+# app/services/identity.py
+
+from flask import current_app
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models.user import User
+from app.services.cache import TTLCache
+
+
+def init_app(app):
+    app.extensions['identity_cache'] = TTLCache(
+        maxsize=app.config.get('IDENTITY_CACHE_SIZE', 1024),
+        ttl=app.config.get('IDENTITY_CACHE_TTL_SECONDS', 60)
+    )
+
+
+def _cache():
+    return current_app.extensions['identity_cache']
+
+
+def load_user(user_id):
+    """
+    Returns the user for a session cookie, with their role already loaded.
+
+    Users are cached per process as detached instances (user and role fetched with
+    one joined query) and merged into the request's session with load=False, which
+    issues no SQL but still lets the route modify and commit the user as usual.
+
+    Cache hits are not checked against the database. Under several worker
+    processes a user who was demoted, deactivated or deleted through another
+    worker keeps their old role here for up to IDENTITY_CACHE_TTL_SECONDS; set
+    it to 0 where permission changes must apply on the next request.
+    """
+    user_id = int(user_id)
+    if current_app.config.get('IDENTITY_CACHE_TTL_SECONDS', 60) <= 0:
+        return User.query.options(joinedload(User.role)).filter_by(id=user_id).first()
+
+    cached = _cache().get(user_id)
+    if cached is None:
+        cached = User.query.options(joinedload(User.role)).filter_by(id=user_id).first()
+        if cached is None:
+            return None
+        db.session.expunge(cached.role)
+        db.session.expunge(cached)
+        _cache().set(user_id, cached)
+    return db.session.merge(cached, load=False)
+
+
+def invalidate_user(user_id):
+    """
+    Drops a user from this process's cache after their account, role or password
+    changes. Only this process is affected: other worker processes keep serving
+    their cached copy, old role included, until it expires after
+    IDENTITY_CACHE_TTL_SECONDS.
+    """
+    _cache().pop(int(user_id))
@@ -0,0 +1,214 @@
+# app/services/importer.py
+
+import io
+import csv
+import json
+from datetime import datetime
+from app import db
+from app.models.quiz import Question, Contestant
+from app.services import dashboard_stats, leaderboard, quiz_payload
+
+QUESTION_FIELDS = ('question_text', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_answer')
+OPTION_MAX_LENGTH = 200 # Matches Question.option_* column length
+NAME_MAX_LENGTH = 100 # Matches Contestant.name
+EMAIL_MAX_LENGTH = 120 # Matches Contestant.email
+MAX_REPORTED_ERRORS = 500 # Keep the error report bounded however bad the file is
+
+
+def detect_format(filename, explicit=None):
+    fmt = (explicit or (filename.rsplit('.', 1)[-1] if filename and '.' in filename else '')).lower()
+    if fmt in ('jsonl', 'ndjson'):
+        return 'jsonl'
+    if fmt == 'csv':
+        return 'csv'
+    raise ValueError('Unsupported file format. Upload a .csv or .jsonl file.')
+
+
+def iter_records(stream, fmt):
+    """
+    Yields (line_number, record, error) for each row of a CSV (with a header row)
+    or JSONL stream, reading it incrementally. Exactly one of record/error is set.
+    """
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record, None
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f'Invalid JSON: {e}'
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, 'Each line must be a JSON object.'
+            continue
+        yield line_number, record, None
+
+
+class ImportReport:
+    def __init__(self):
+        self.inserted = 0
+        self.skipped = 0
+        self.errors = []
+
+    def add_error(self, line_number, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line_number, 'error': message})
+
+    def as_dict(self):
+        return {'inserted': self.inserted, 'skipped': self.skipped, 'errors': self.errors}
+
+
+def _validate_question(record):
+    row = {}
+    for field in QUESTION_FIELDS:
+        value = record.get(field)
+        value = str(value).strip() if value is not None else ''
+        if not value:
+            return None, f'Missing {field}.'
+        row[field] = value
+    row['correct_answer'] = row['correct_answer'].lower()
+    if row['correct_answer'] not in ('a', 'b', 'c', 'd'):
+        return None, 'correct_answer must be a, b, c, or d.'
+    for field in ('option_a', 'option_b', 'option_c', 'option_d'):
+        if len(row[field]) > OPTION_MAX_LENGTH:
+            return None, f'{field} is longer than {OPTION_MAX_LENGTH} characters.'
+    return row, None
+
+
+def import_questions(quiz, stream, fmt, batch_size=500):
+    """
+    Streams questions into a quiz. Rows are validated one at a time and valid
+    ones are inserted in batches of batch_size, each batch in its own committed
+    transaction (which also bumps the quiz content version). Invalid rows are
+    skipped and reported by line number.
+    """
+    report = ImportReport()
+    batch = []
+
+    def flush():
+        db.session.execute(db.insert(Question), batch)
+        quiz_payload.invalidate(quiz)
+        db.session.commit()
+        report.inserted += len(batch)
+        batch.clear()
+
+    for line_number, record, error in iter_records(stream, fmt):
+        if error is None:
+            row, error = _validate_question(record)
+        if error:
+            report.add_error(line_number, error)
+            continue
+        row['quiz_id'] = quiz.id
+        batch.append(row)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return report
+
+
+def _validate_contestant(record):
+    name = str(record.get('name') or '').strip()
+    email = str(record.get('email') or '').strip() or None
+    if not name:
+        return None, 'Missing name.'
+    if len(name) > NAME_MAX_LENGTH:
+        return None, f'name is longer than {NAME_MAX_LENGTH} characters.'
+    if email and len(email) > EMAIL_MAX_LENGTH:
+        return None, f'email is longer than {EMAIL_MAX_LENGTH} characters.'
+    return {'name': name, 'email': email}, None
+
+
+def _copy_contestants(quiz_id, rows):
+    """
+    Loads a batch with PostgreSQL COPY through the session's own connection, so
+    it shares the caller's transaction. Returns False when the driver has no
+    COPY support and the caller should fall back to executemany.
+    """
+    dbapi_connection = db.session.connection().connection.dbapi_connection
+    cursor = dbapi_connection.cursor()
+    if not hasattr(cursor, 'copy_expert'): # psycopg2 API
+        cursor.close()
+        return False
+
+    created_at = datetime.utcnow().isoformat(sep=' ')
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        # An unquoted empty field is NULL in COPY's CSV format
+        writer.writerow([quiz_id, row['name'], row['email'] or '', 0, created_at])
+    buffer.seek(0)
+    try:
+        cursor.copy_expert(
+            f'COPY {Contestant.__table__.name} (quiz_id, name, email, score, created_at) FROM STDIN WITH (FORMAT csv)',
+            buffer
+        )
+    finally:
+        cursor.close()
+    return True
+
+
+def import_contestants(quiz, stream, fmt, batch_size=5000):
+    """
+    Streams a roster (CSV with name/email columns, or JSONL) into a quiz.
+
+    Duplicates are rejected with one set-based pass: the quiz's existing names
+    and emails are loaded once into sets, and every accepted row is added to
+    them, so repeats inside the file and against the database are both caught
+    (names and emails compare case-insensitively). Accepted rows are loaded in
+    committed batches with COPY on PostgreSQL and executemany elsewhere.
+    """
+    report = ImportReport()
+    existing = db.session.query(Contestant.name, Contestant.email).filter(Contestant.quiz_id == quiz.id)
+    seen_names, seen_emails = set(), set()
+    for name, email in existing:
+        seen_names.add(name.strip().lower())
+        if email:
+            seen_emails.add(email.strip().lower())
+
+    use_copy = db.session.get_bind(mapper=Contestant).dialect.name == 'postgresql'
+    batch = []
+
+    def flush():
+        nonlocal use_copy
+        if not (use_copy and _copy_contestants(quiz.id, batch)):
+            use_copy = False
+            db.session.execute(db.insert(Contestant), [dict(row, quiz_id=quiz.id, score=0) for row in batch])
+        db.session.commit()
+        report.inserted += len(batch)
+        batch.clear()
+
+    for line_number, record, error in iter_records(stream, fmt):
+        if error is None:
+            row, error = _validate_contestant(record)
+        if error is None:
+            name_key = row['name'].lower()
+            email_key = row['email'].lower() if row['email'] else None
+            if name_key in seen_names:
+                error = f"Duplicate name '{row['name']}'."
+            elif email_key and email_key in seen_emails:
+                error = f"Duplicate email '{row['email']}'."
+        if error:
+            report.add_error(line_number, error)
+            continue
+        seen_names.add(name_key)
+        if email_key:
+            seen_emails.add(email_key)
+        batch.append(row)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    leaderboard.get_store().invalidate(quiz.id)
+    dashboard_stats.invalidate() # Core inserts bypass the session's change tracking
+    return report
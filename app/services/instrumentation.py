@@ -0,0 +1,204 @@
+# app/services/instrumentation.py
+
+import re
+import time
+import logging
+import threading
+from collections import deque
+from flask import current_app, g, request, request_started, request_finished, has_request_context
+from sqlalchemy import event
+from app import db
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+RECENT_N_PLUS_ONE = 50 # Flagged patterns kept for inspection
+
+# Expanded IN lists vary in length; collapse them so one query shape counts once
+_IN_LIST = re.compile(r'\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*\)')
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout. Callers hold the registry lock."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+
+class RequestMetrics:
+    """
+    Per-endpoint request latency, SQL statement count and SQL time, plus a count
+    of requests that repeated one statement shape often enough to look like an
+    N+1 query. Everything is kept in this process's memory; with several worker
+    processes each scrape sees the worker that served it.
+    """
+
+    def __init__(self, n_plus_one_threshold=5):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._lock = threading.Lock()
+        self._histograms = {} # (metric, endpoint) -> Histogram
+        self._requests = {} # (endpoint, method, status) -> count
+        self._n_plus_one = {} # endpoint -> count
+        self.recent_n_plus_one = deque(maxlen=RECENT_N_PLUS_ONE)
+        self._reported = set()
+
+    def _observe(self, metric, endpoint, buckets, value):
+        histogram = self._histograms.get((metric, endpoint))
+        if histogram is None:
+            histogram = self._histograms[(metric, endpoint)] = Histogram(buckets)
+        histogram.observe(value)
+
+    def record(self, endpoint, method, status, seconds, statements, sql_seconds, repeated):
+        with self._lock:
+            self._observe('request_duration_seconds', endpoint, LATENCY_BUCKETS, seconds)
+            self._observe('request_sql_statements', endpoint, STATEMENT_BUCKETS, statements)
+            self._observe('request_sql_duration_seconds', endpoint, LATENCY_BUCKETS, sql_seconds)
+            key = (endpoint, method, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            if repeated:
+                self._n_plus_one[endpoint] = self._n_plus_one.get(endpoint, 0) + 1
+                for shape, count in repeated:
+                    self.recent_n_plus_one.append({'endpoint': endpoint, 'statement': shape, 'count': count})
+                    if (endpoint, shape) not in self._reported: # Log each pattern once per process
+                        self._reported.add((endpoint, shape))
+                        logger.warning('Possible N+1 in %s: statement ran %d times: %s', endpoint, count, shape)
+
+    def render(self, extra=()):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            for metric in ('request_duration_seconds', 'request_sql_statements', 'request_sql_duration_seconds'):
+                name = f'brainstorm_{metric}'
+                lines.append(f'# TYPE {name} histogram')
+                for (kind, endpoint), histogram in histograms:
+                    if kind != metric:
+                        continue
+                    label = f'endpoint="{_escape(endpoint)}"'
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{label},le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_bucket{{{label},le="+Inf"}} {histogram.count}')
+                    lines.append(f'{name}_sum{{{label}}} {_number(histogram.total)}')
+                    lines.append(f'{name}_count{{{label}}} {histogram.count}')
+
+            lines.append('# TYPE brainstorm_requests_total counter')
+            for (endpoint, method, status), count in sorted(self._requests.items()):
+                lines.append(f'brainstorm_requests_total{{endpoint="{_escape(endpoint)}",method="{method}",status="{status}"}} {count}')
+            lines.append('# TYPE brainstorm_n_plus_one_requests_total counter')
+            for endpoint, count in sorted(self._n_plus_one.items()):
+                lines.append(f'brainstorm_n_plus_one_requests_total{{endpoint="{_escape(endpoint)}"}} {count}')
+        lines.extend(extra)
+        return '\n'.join(lines) + '\n'
+
+
+def _number(value):
+    return str(int(value)) if float(value).is_integer() else f'{value:.6f}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def hashing_lines(metrics):
+    """Prometheus lines for the password hasher's metrics() dict."""
+    lines = [
+        '# TYPE brainstorm_password_hash_queue_depth gauge',
+        f"brainstorm_password_hash_queue_depth {metrics['queue_depth']}",
+        '# TYPE brainstorm_password_hash_workers gauge',
+        f"brainstorm_password_hash_workers {metrics['workers']}",
+        '# TYPE brainstorm_password_hash_seconds summary'
+    ]
+    for operation in ('hash', 'check'):
+        stats = metrics[operation]
+        lines.append(f'brainstorm_password_hash_seconds_sum{{operation="{operation}"}} {stats["seconds_total"]:.6f}')
+        lines.append(f'brainstorm_password_hash_seconds_count{{operation="{operation}"}} {stats["count"]}')
+    lines.append('# TYPE brainstorm_password_hash_seconds_max gauge')
+    for operation in ('hash', 'check'):
+        lines.append(f'brainstorm_password_hash_seconds_max{{operation="{operation}"}} {metrics[operation]["seconds_max"]:.6f}')
+    return lines
+
+
+def init_app(app):
+    """
+    Hooks the app's engines and request signals. Each statement costs two
+    perf_counter calls and a dict update, so this is meant to stay on in
+    production; set INSTRUMENTATION_ENABLED=False to skip it entirely.
+    """
+    app.extensions['request_metrics'] = RequestMetrics(app.config.get('SQL_N_PLUS_ONE_THRESHOLD', 5))
+    if not app.config.get('INSTRUMENTATION_ENABLED', True):
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+            event.listen(engine, 'handle_error', _handle_error)
+    request_started.connect(_request_started, app)
+    request_finished.connect(_request_finished, app)
+
+
+def get_metrics():
+    return current_app.extensions['request_metrics']
+
+
+def _request_started(sender, **extra):
+    g._instrumentation = {'started': time.perf_counter(), 'statements': 0, 'sql_seconds': 0.0, 'shapes': {}}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_started'].pop()
+    state = g.get('_instrumentation') if has_request_context() else None
+    if state is None: # CLI commands, background jobs, startup
+        return
+    state['statements'] += 1
+    state['sql_seconds'] += elapsed
+    shapes = state['shapes']
+    shapes[statement] = shapes.get(statement, 0) + 1
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    if context.connection is not None and context.connection.info.get('query_started'):
+        context.connection.info['query_started'].pop()
+
+
+def _repeated_shapes(shapes, threshold):
+    collapsed = {}
+    for statement, count in shapes.items():
+        shape = _IN_LIST.sub('(...)', statement)
+        collapsed[shape] = collapsed.get(shape, 0) + count
+    return [(shape, count) for shape, count in collapsed.items() if count >= threshold]
+
+
+def _request_finished(sender, response, **extra):
+    state = g.pop('_instrumentation', None)
+    if state is None:
+        return
+    metrics = sender.extensions['request_metrics']
+    repeated = _repeated_shapes(state['shapes'], metrics.n_plus_one_threshold) if state['statements'] >= metrics.n_plus_one_threshold else []
+    metrics.record(
+        request.endpoint or 'unmatched', # Unrouted paths share one label to bound cardinality
+        request.method,
+        response.status_code,
+        time.perf_counter() - state['started'],
+        state['statements'],
+        state['sql_seconds'],
+        repeated
+    )
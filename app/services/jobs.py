@@ -0,0 +1,62 @@
+# app/services/jobs.py
+
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from app import db
+from app.models.job import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+
+def init_app(app):
+    app.extensions['job_executor'] = ThreadPoolExecutor(max_workers=app.config.get('BACKGROUND_JOB_WORKERS', 1),
+                                                        thread_name_prefix='background-job')
+
+
+def submit(kind, target_id, fn, *args, total=0, created_by=None):
+    """
+    Records a job and runs fn(progress, *args) on the background thread pool,
+    inside its own application context and database session. fn reports how
+    far it has got by calling progress(done, total=None), which commits the
+    counts so the progress endpoint can read them from any worker process.
+
+    Jobs run in the submitting process; one that is killed mid-run stays
+    'running' in the table and its work has to be resubmitted.
+    """
+    job = BackgroundJob(kind=kind, target_id=target_id, total=total, created_by=created_by)
+    db.session.add(job)
+    db.session.commit()
+    app = current_app._get_current_object()
+    app.extensions['job_executor'].submit(_run, app, job.id, fn, args)
+    return job
+
+
+def _set(job_id, **values):
+    db.session.execute(db.update(BackgroundJob).where(BackgroundJob.id == job_id).values(**values))
+    db.session.commit()
+
+
+def _run(app, job_id, fn, args):
+    with app.app_context():
+        _set(job_id, status='running')
+
+        def progress(done, total=None):
+            values = {'done': done}
+            if total is not None:
+                values['total'] = total
+            _set(job_id, **values)
+
+        try:
+            fn(progress, *args)
+        except Exception as e:
+            db.session.rollback()
+            logger.exception('Background job %s failed', job_id)
+            _set(job_id, status='failed', error=str(e), finished_at=datetime.utcnow())
+        else:
+            _set(job_id, status='finished', finished_at=datetime.utcnow())
+
+
+def get_job(job_id):
+    return db.session.get(BackgroundJob, job_id)
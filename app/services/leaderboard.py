@@ -0,0 +1,142 @@
+# app/services/leaderboard.py
+
+import time
+import threading
+from bisect import bisect_left, insort
+from flask import current_app
+from app import db
+from app.models.quiz import Contestant
+
+
+class Leaderboard:
+    """
+    Ranking for one quiz, kept as a sorted index of (-score, contestant_id) keys.
+    Rank lookups and slice boundaries are binary searches, and a score change moves
+    a single key, so reads never re-sort or reload the contestant list.
+
+    Ranks follow the results page convention: tied scores share a rank and the
+    next distinct score skips ahead (1, 2, 2, 4).
+    """
+
+    def __init__(self, quiz_id, rows):
+        self.quiz_id = quiz_id
+        self.built_at = time.monotonic()
+        self._lock = threading.RLock()
+        self._entries = {}
+        keys = []
+        for contestant_id, name, score, submitted_at in rows:
+            score = score or 0
+            self._entries[contestant_id] = {'name': name, 'score': score, 'completed': submitted_at is not None}
+            keys.append((-score, contestant_id))
+        keys.sort()
+        self._keys = keys
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, contestant_id):
+        return contestant_id in self._entries
+
+    def update_score(self, contestant_id, score):
+        score = score or 0
+        with self._lock:
+            entry = self._entries[contestant_id]
+            if entry['score'] == score:
+                return
+            old_key = (-entry['score'], contestant_id)
+            del self._keys[bisect_left(self._keys, old_key)]
+            insort(self._keys, (-score, contestant_id))
+            entry['score'] = score
+
+    def mark_completed(self, contestant_id):
+        with self._lock:
+            self._entries[contestant_id]['completed'] = True
+
+    def _rank_for_score(self, score):
+        # Number of contestants with a strictly higher score, plus one
+        return bisect_left(self._keys, (-score,)) + 1
+
+    def rank_of(self, contestant_id):
+        with self._lock:
+            entry = self._entries.get(contestant_id)
+            return self._rank_for_score(entry['score']) if entry else None
+
+    def slice(self, offset=0, limit=None):
+        """Returns ranked rows for positions [offset, offset + limit)."""
+        with self._lock:
+            end = len(self._keys) if limit is None else offset + limit
+            results = []
+            for neg_score, contestant_id in self._keys[offset:end]:
+                entry = self._entries[contestant_id]
+                results.append({
+                    'rank': self._rank_for_score(-neg_score),
+                    'contestant_id': contestant_id,
+                    'name': entry['name'],
+                    'score': entry['score'],
+                    'status': 'Completed' if entry['completed'] else 'In Progress'
+                })
+            return results
+
+    def top(self, n):
+        return self.slice(0, n)
+
+
+def rows_query(quiz_id):
+    """The contestant rows a quiz's board is built from; the board sorts them itself."""
+    return db.select(Contestant.id, Contestant.name, Contestant.score, Contestant.submitted_at) \
+             .where(Contestant.quiz_id == quiz_id)
+
+
+class LeaderboardStore:
+    """
+    Per-process registry of quiz leaderboards. Boards are built from the database
+    on first use and kept current by the answer and completion routes. Because
+    other worker processes update the database without touching this process's
+    boards, a board older than LEADERBOARD_TTL_SECONDS is rebuilt on next read.
+    """
+
+    def __init__(self, app=None):
+        self.ttl = 10
+        self._boards = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.ttl = app.config.get('LEADERBOARD_TTL_SECONDS', self.ttl)
+
+    def get(self, quiz_id):
+        board = self._boards.get(quiz_id)
+        if board is None or time.monotonic() - board.built_at > self.ttl:
+            rows = db.session.execute(rows_query(quiz_id)).all()
+            board = Leaderboard(quiz_id, rows)
+            with self._lock:
+                self._boards[quiz_id] = board
+        return board
+
+    def peek(self, quiz_id):
+        """Returns the board only if it is already built."""
+        return self._boards.get(quiz_id)
+
+    def invalidate(self, quiz_id):
+        with self._lock:
+            self._boards.pop(quiz_id, None)
+
+    def apply_score(self, quiz_id, contestant_id, score):
+        board = self.peek(quiz_id)
+        if board is None:
+            return
+        if contestant_id in board:
+            board.update_score(contestant_id, score)
+        else:
+            self.invalidate(quiz_id) # Contestant registered after the board was built
+
+    def mark_completed(self, quiz_id, contestant_id):
+        board = self.peek(quiz_id)
+        if board is not None and contestant_id in board:
+            board.mark_completed(contestant_id)
+
+
+def init_app(app):
+    app.extensions['leaderboards'] = LeaderboardStore(app)
+
+
+def get_store():
+    return current_app.extensions['leaderboards']
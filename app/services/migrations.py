@@ -0,0 +1,127 @@
+# app/services/migrations.py
+
+import re
+import pkgutil
+import importlib
+from datetime import datetime
+import sqlalchemy as sa
+from app import db
+
+MIGRATIONS_PACKAGE = 'app.migrations'
+VERSION_TABLE = 'schema_version'
+_MODULE_NAME = re.compile(r'^v(\d{4})_(\w+)$')
+
+schema_version = sa.Table(
+    VERSION_TABLE, sa.MetaData(),
+    sa.Column('version', sa.Integer, primary_key=True),
+    sa.Column('name', sa.String(100), nullable=False),
+    sa.Column('applied_at', sa.DateTime, nullable=False)
+)
+
+
+class Migration:
+    def __init__(self, version, name, module):
+        self.version = version
+        self.name = name
+        self.module = module
+        # Non-transactional migrations run in autocommit mode, which PostgreSQL
+        # needs for CREATE INDEX CONCURRENTLY
+        self.transactional = getattr(module, 'transactional', True)
+        self.description = (module.__doc__ or name).strip().splitlines()[0]
+
+
+def discover():
+    """Returns the migrations in app/migrations (modules named vNNNN_description), in version order."""
+    package = importlib.import_module(MIGRATIONS_PACKAGE)
+    migrations = []
+    for module_info in pkgutil.iter_modules(package.__path__):
+        match = _MODULE_NAME.match(module_info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f'{MIGRATIONS_PACKAGE}.{module_info.name}')
+        migrations.append(Migration(int(match.group(1)), match.group(2), module))
+    migrations.sort(key=lambda m: m.version)
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError('Duplicate migration version numbers in app/migrations.')
+    return migrations
+
+
+def applied_versions(engine=None):
+    engine = engine or db.engine
+    with engine.connect() as conn:
+        if not sa.inspect(conn).has_table(VERSION_TABLE):
+            return {}
+        return {row.version: row for row in conn.execute(sa.select(schema_version))}
+
+
+def current_version(engine=None):
+    versions = applied_versions(engine)
+    return max(versions) if versions else 0
+
+
+def pending(engine=None):
+    applied = applied_versions(engine)
+    return [m for m in discover() if m.version not in applied]
+
+
+def upgrade(target=None, engine=None, echo=None):
+    """
+    Applies every pending migration up to target (default: all), each in its
+    own transaction together with its schema_version row. Returns the list of
+    migrations that ran.
+    """
+    engine = engine or db.engine
+    schema_version.create(engine, checkfirst=True)
+    ran = []
+    for migration in pending(engine):
+        if target is not None and migration.version > target:
+            break
+        if echo:
+            echo(f'Applying {migration.version:04d} {migration.name}: {migration.description}')
+        if migration.transactional:
+            with engine.begin() as conn:
+                migration.module.upgrade(conn)
+                _record(conn, migration)
+        else:
+            with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                migration.module.upgrade(conn)
+                _record(conn, migration)
+        ran.append(migration)
+    return ran
+
+
+def _record(conn, migration):
+    conn.execute(schema_version.insert().values(version=migration.version, name=migration.name,
+                                                applied_at=datetime.utcnow()))
+
+
+# --- Helpers for migration modules. Each checks the live schema first, so a
+# migration can safely run against a database built by db.create_all(). ---
+
+def has_column(conn, table, column):
+    return any(c['name'] == column for c in sa.inspect(conn).get_columns(table))
+
+
+def has_index(conn, table, name):
+    inspector = sa.inspect(conn)
+    return any(i['name'] == name for i in inspector.get_indexes(table)) or \
+        any(c['name'] == name for c in inspector.get_unique_constraints(table))
+
+
+def create_index(conn, name, table, columns, unique=False):
+    """
+    Creates an index unless one with that name exists. On PostgreSQL outside a
+    transaction it is built CONCURRENTLY so live traffic is not blocked.
+    """
+    if has_index(conn, table, name):
+        return False
+    preparer = conn.dialect.identifier_preparer
+    concurrently = ''
+    if conn.dialect.name == 'postgresql' and conn.get_isolation_level() == 'AUTOCOMMIT':
+        concurrently = 'CONCURRENTLY '
+    conn.exec_driver_sql(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX {concurrently}{preparer.quote(name)} "
+        f"ON {preparer.quote(table)} ({', '.join(preparer.quote(c) for c in columns)})"
+    )
+    return True
@@ -0,0 +1,125 @@
+# app/services/pagination.py
+
+import json
+import base64
+import binascii
+from datetime import datetime
+from flask import request
+from app import db
+
+DEFAULT_PER_PAGE = 25
+MAX_PER_PAGE = 200
+
+
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    """Turns a cursor back into typed values for columns, or None if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if not isinstance(values, list) or len(values) != len(columns):
+        return None
+    typed = [_cursor_value(column, v) for column, v in zip(columns, values)]
+    return None if None in typed else typed
+
+
+def _cursor_value(column, value):
+    # Sort columns are NOT NULL, so a value that is missing or of the wrong
+    # type means the cursor was tampered with; the database must never see it
+    expected = column.type.python_type
+    if expected is datetime:
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return None
+    if isinstance(value, bool) or not isinstance(value, expected):
+        return None
+    return value
+
+
+class KeysetPage:
+    def __init__(self, items, sort, direction, per_page, next_cursor, prev_cursor):
+        self.items = items
+        self.sort = sort
+        self.direction = direction
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+
+def keyset_paginate(query, sort_options, default_sort, id_column, default_direction='asc'):
+    """
+    Seek-method pagination driven by the request's sort, dir, after, before
+    and per_page arguments.
+
+    sort_options maps a sort name to a NOT NULL column; id_column breaks ties,
+    so (sort column, id) is a unique key. Instead of OFFSET the query asks for
+    rows past the last key seen, which an index on (..., sort column, id) turns
+    into a short range scan whatever page is being read. Cursors are opaque
+    encodings of that key.
+    """
+    sort = request.args.get('sort', default_sort)
+    if sort not in sort_options:
+        sort = default_sort
+    direction = request.args.get('dir', default_direction)
+    if direction not in ('asc', 'desc'):
+        direction = default_direction
+    per_page = min(max(request.args.get('per_page', DEFAULT_PER_PAGE, type=int), 1), MAX_PER_PAGE)
+
+    sort_column = sort_options[sort]
+    columns = [sort_column] if sort_column is id_column else [sort_column, id_column]
+    key = db.tuple_(*columns) if len(columns) > 1 else columns[0]
+
+    after = decode_cursor(request.args['after'], columns) if request.args.get('after') else None
+    before = decode_cursor(request.args['before'], columns) if request.args.get('before') else None
+    # Walking backwards reads the rows just before the cursor in reverse order
+    backwards = before is not None and after is None
+    descending = (direction == 'desc') != backwards
+    boundary = before if backwards else after
+
+    if boundary is not None:
+        bound = db.tuple_(*boundary) if len(columns) > 1 else boundary[0]
+        query = query.filter(key < bound if descending else key > bound)
+    query = query.order_by(*[c.desc() if descending else c.asc() for c in columns])
+
+    rows = query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    def cursor_for(item):
+        return encode_cursor([getattr(item, c.key) for c in columns])
+
+    if not rows:
+        return KeysetPage(rows, sort, direction, per_page, None, None)
+    has_next = has_more if not backwards else True
+    has_prev = has_more if backwards else boundary is not None
+    return KeysetPage(rows, sort, direction, per_page,
+                      cursor_for(rows[-1]) if has_next else None,
+                      cursor_for(rows[0]) if has_prev else None)
+
+
+def search_term():
+    """The request's ?q= filter, stripped, or None."""
+    return (request.args.get('q') or '').strip() or None
+
+
+def contains(column, term):
+    # Escape LIKE wildcards so the filter matches the literal text typed
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return column.ilike(f'%{escaped}%', escape='\\')
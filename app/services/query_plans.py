@@ -0,0 +1,57 @@
+# app/services/query_plans.py
+
+from app import db
+from app.models.quiz import Quiz, Question, Contestant, ContestantAnswer
+from app.services import answers, leaderboard, quiz_payload
+
+
+def _sample_ids(conn):
+    # Plan the queries against a real quiz, preferring one that has contestants
+    quiz_id = conn.execute(db.select(Contestant.quiz_id).limit(1)).scalar() or \
+        conn.execute(db.select(Quiz.id).limit(1)).scalar() or 1
+    contestant_ids = conn.execute(db.select(Contestant.id).where(Contestant.quiz_id == quiz_id).limit(20)).scalars().all() or [1]
+    question_ids = conn.execute(db.select(Question.id).where(Question.quiz_id == quiz_id).limit(20)).scalars().all() or [1]
+    return quiz_id, contestant_ids, question_ids
+
+
+def route_queries(conn):
+    """
+    The statements behind the main routes, as (label, statement) pairs. Where a
+    service builds its statement in one place, the plan uses that builder so it
+    shows the access path the route really takes.
+    """
+    quiz_id, contestant_ids, question_ids = _sample_ids(conn)
+    pairs = list(zip(contestant_ids, question_ids))
+    return [
+        ('moderator.dashboard', db.select(
+            Quiz.id, db.func.count(Contestant.id), db.func.count(Contestant.submitted_at)
+        ).outerjoin(Contestant, Contestant.quiz_id == Quiz.id)
+         .where(Quiz.is_active == True).group_by(Quiz.id).order_by(Quiz.quiz_date.asc())),
+        ('admin.dashboard upcoming quizzes', db.select(Quiz.id, Quiz.title)
+         .where(Quiz.quiz_date > db.func.current_timestamp()).order_by(Quiz.quiz_date.asc()).limit(5)),
+        ('moderator.quiz_session questions', quiz_payload.questions_query(quiz_id)),
+        ('moderator.quiz_session contestants', db.select(Contestant.id, Contestant.name, Contestant.score)
+         .where(Contestant.quiz_id == quiz_id).order_by(Contestant.id)),
+        ('answers.answer_matrix', db.select(ContestantAnswer.contestant_id, ContestantAnswer.question_id,
+                                            ContestantAnswer.selected_option)
+         .join(Contestant, Contestant.id == ContestantAnswer.contestant_id).where(Contestant.quiz_id == quiz_id)),
+        ('answers.record_answers lock existing', answers.locked_answers_query(pairs)),
+        ('answers.record_answers update existing', answers.update_answers_query(pairs, 'a', True)),
+        ('leaderboard rebuild', leaderboard.rows_query(quiz_id)),
+        ('admin.contestant_registration page', db.select(Contestant)
+         .where(Contestant.quiz_id == quiz_id).order_by(Contestant.name, Contestant.id).limit(26)),
+    ]
+
+
+def explain(conn, statement):
+    """Returns the database's plan for statement as a list of lines."""
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={'literal_binds': True}))
+    if conn.dialect.name == 'sqlite':
+        return [row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')]
+    return [row[0] for row in conn.exec_driver_sql(f'EXPLAIN {sql}')]
+
+
+def explain_all(engine=None):
+    engine = engine or db.engine
+    with engine.connect() as conn:
+        return [(label, explain(conn, statement)) for label, statement in route_queries(conn)]
@@ -0,0 +1,174 @@
+# app/services/question_stats.py
+
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models.quiz import Question, ContestantAnswer, QuestionStat
+
+OPTIONS = ('a', 'b', 'c', 'd')
+COUNTERS = ('answered', 'correct', 'count_a', 'count_b', 'count_c', 'count_d')
+
+
+def _empty():
+    return dict.fromkeys(COUNTERS, 0)
+
+
+def deltas_for(changes):
+    """
+    Turns answer changes into counter deltas per question. Each change is
+    ((contestant_id, question_id), old, new), where old and new are
+    (selected_option, is_correct) and old is None for a newly stored answer.
+    """
+    deltas = {}
+    for (_, question_id), old, new in changes:
+        delta = deltas.setdefault(question_id, _empty())
+        if old is None:
+            delta['answered'] += 1
+        else:
+            delta['count_' + old[0]] -= 1
+            delta['correct'] -= int(bool(old[1]))
+        delta['count_' + new[0]] += 1
+        delta['correct'] += int(bool(new[1]))
+    return {qid: d for qid, d in deltas.items() if any(d.values())}
+
+
+def apply_deltas(deltas):
+    """
+    Adds counter deltas in the caller's transaction with a single upsert
+    (ON CONFLICT DO UPDATE col = col + excluded.col), creating missing rows.
+    The increments happen in the database, so concurrent writers never lose
+    each other's counts. Does not commit.
+    """
+    if not deltas:
+        return
+    rows = [dict(deltas[qid], question_id=qid) for qid in sorted(deltas)] # Stable lock order
+    dialect = db.session.get_bind(mapper=QuestionStat).dialect.name
+
+    if dialect in ('postgresql', 'sqlite'):
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = insert(QuestionStat).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[QuestionStat.question_id],
+            set_={c: getattr(QuestionStat, c) + getattr(stmt.excluded, c) for c in COUNTERS}
+        )
+        db.session.execute(stmt)
+        return
+
+    for row in rows:
+        updated = db.session.execute(
+            db.update(QuestionStat).where(QuestionStat.question_id == row['question_id'])
+              .values({c: getattr(QuestionStat, c) + row[c] for c in COUNTERS})
+              .execution_options(synchronize_session=False)
+        ).rowcount
+        if not updated:
+            db.session.execute(db.insert(QuestionStat), row)
+
+
+def discount_contestants(contestant_ids):
+    """
+    Subtracts the stored answers of contestants that are about to be deleted,
+    with one grouped query. Call it in the same transaction as the delete.
+    """
+    if not contestant_ids:
+        return
+    rows = db.session.execute(
+        _aggregate(ContestantAnswer.question_id, inner=True)
+          .where(ContestantAnswer.contestant_id.in_(list(contestant_ids)))
+    )
+    apply_deltas({row.question_id: {c: -getattr(row, c) for c in COUNTERS} for row in rows})
+
+
+def _aggregate(question_column, inner=False):
+    """
+    Counts answers per question in a single grouped pass over contestant_answer:
+    one SUM(CASE ...) per counter. With inner=False every question is included,
+    answered or not.
+    """
+    def tally(condition):
+        return db.func.coalesce(db.func.sum(db.case((condition, 1), else_=0)), 0)
+
+    columns = [
+        question_column.label('question_id'),
+        db.func.count(ContestantAnswer.id).label('answered'),
+        tally(ContestantAnswer.is_correct == True).label('correct'),
+        *[tally(ContestantAnswer.selected_option == option).label('count_' + option) for option in OPTIONS]
+    ]
+    if inner:
+        return db.select(*columns).group_by(question_column)
+    return db.select(*columns) \
+             .select_from(Question) \
+             .outerjoin(ContestantAnswer, ContestantAnswer.question_id == Question.id) \
+             .group_by(question_column)
+
+
+def recompute_statements(quiz_id=None):
+    """The DELETE and INSERT ... SELECT that rebuild the counters for one quiz, or all."""
+    aggregate = _aggregate(Question.id)
+    stale = db.delete(QuestionStat)
+    if quiz_id is not None:
+        aggregate = aggregate.where(Question.quiz_id == quiz_id)
+        stale = stale.where(QuestionStat.question_id.in_(db.select(Question.id).where(Question.quiz_id == quiz_id)))
+    return stale.execution_options(synchronize_session=False), \
+        db.insert(QuestionStat).from_select(['question_id', *COUNTERS], aggregate)
+
+
+def recompute(quiz_id=None):
+    """
+    Rebuilds the counters for one quiz (or every quiz) from the raw answers in
+    a single grouped pass, so the work stays in the database.
+    Returns the number of question rows written. Does not commit.
+    """
+    stale, rebuild = recompute_statements(quiz_id)
+    db.session.execute(stale)
+    return db.session.execute(rebuild).rowcount
+
+
+def verify(quiz_id=None):
+    """
+    Compares the stored counters with a fresh aggregate. Returns a list of
+    {'question_id', 'stored', 'actual'} dicts for every question that differs.
+    """
+    aggregate = _aggregate(Question.id)
+    stored = db.select(QuestionStat)
+    if quiz_id is not None:
+        aggregate = aggregate.where(Question.quiz_id == quiz_id)
+        stored = stored.join(Question, Question.id == QuestionStat.question_id).where(Question.quiz_id == quiz_id)
+    stored = {stat.question_id: {c: getattr(stat, c) for c in COUNTERS} for stat in db.session.scalars(stored)}
+
+    mismatches = []
+    for row in db.session.execute(aggregate):
+        actual = {c: getattr(row, c) for c in COUNTERS}
+        current = stored.get(row.question_id, _empty())
+        if current != actual:
+            mismatches.append({'question_id': row.question_id, 'stored': current, 'actual': actual})
+    return mismatches
+
+
+def item_analysis(quiz_id):
+    """
+    Per-question difficulty (share of answers that are correct) and option
+    distribution for a quiz, read straight from the counters.
+    """
+    rows = db.session.query(Question.id, Question.question_text, Question.correct_answer, QuestionStat) \
+                     .outerjoin(QuestionStat, QuestionStat.question_id == Question.id) \
+                     .filter(Question.quiz_id == quiz_id) \
+                     .order_by(Question.id.asc()).all()
+    analysis = []
+    for number, (question_id, text, correct_answer, stat) in enumerate(rows, start=1):
+        counts = {c: getattr(stat, c) if stat else 0 for c in COUNTERS}
+        answered = counts['answered']
+        analysis.append({
+            'number': number,
+            'question_id': question_id,
+            'text': text,
+            'correct_answer': correct_answer,
+            'answered': answered,
+            'correct': counts['correct'],
+            'percent_correct': round(100.0 * counts['correct'] / answered, 1) if answered else None,
+            'options': {
+                option: {
+                    'count': counts['count_' + option],
+                    'percent': round(100.0 * counts['count_' + option] / answered, 1) if answered else 0.0
+                } for option in OPTIONS
+            }
+        })
+    return analysis
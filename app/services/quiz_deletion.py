@@ -0,0 +1,89 @@
+# app/services/quiz_deletion.py
+
+from flask import current_app
+from app import db
+from app.models.quiz import Quiz, Question, Contestant, ContestantAnswer, QuestionStat
+from app.services import dashboard_stats, jobs, leaderboard, quiz_payload
+
+
+def count_rows(quiz_id):
+    """Rows a quiz delete removes: questions, contestants and their answers. One query."""
+    return db.session.query(
+        db.select(db.func.count(Question.id)).where(Question.quiz_id == quiz_id).scalar_subquery() +
+        db.select(db.func.count(Contestant.id)).where(Contestant.quiz_id == quiz_id).scalar_subquery() +
+        db.select(db.func.count(ContestantAnswer.id))
+          .join(Contestant, Contestant.id == ContestantAnswer.contestant_id)
+          .where(Contestant.quiz_id == quiz_id).scalar_subquery()
+    ).scalar()
+
+
+def _delete_questions(quiz_id):
+    question_ids = db.select(Question.id).where(Question.quiz_id == quiz_id)
+    deleted = db.session.execute(db.delete(ContestantAnswer).where(ContestantAnswer.question_id.in_(question_ids))).rowcount
+    db.session.execute(db.delete(QuestionStat).where(QuestionStat.question_id.in_(question_ids)))
+    return deleted + db.session.execute(db.delete(Question).where(Question.quiz_id == quiz_id)).rowcount
+
+
+def delete_quiz_now(quiz_id):
+    """
+    Deletes a quiz and everything under it with a few set-based DELETEs, children
+    first, in the caller's transaction. The statements are explicit rather than
+    left to ON DELETE CASCADE so SQLite (which ignores foreign keys by default)
+    ends up in the same state. Does not commit.
+    """
+    contestant_ids = db.select(Contestant.id).where(Contestant.quiz_id == quiz_id)
+    db.session.execute(db.delete(ContestantAnswer).where(ContestantAnswer.contestant_id.in_(contestant_ids)))
+    _delete_questions(quiz_id)
+    db.session.execute(db.delete(Contestant).where(Contestant.quiz_id == quiz_id))
+    db.session.execute(db.delete(Quiz).where(Quiz.id == quiz_id).execution_options(synchronize_session='fetch'))
+
+
+def delete_quiz_in_batches(progress, quiz_id, batch_size=1000):
+    """
+    Background variant: removes contestants (with their answers) batch_size at a
+    time, committing each batch so locks stay short and progress is visible,
+    then the questions and finally the quiz row.
+    """
+    done = 0
+    while True:
+        batch = db.session.execute(
+            db.select(Contestant.id).where(Contestant.quiz_id == quiz_id).order_by(Contestant.id).limit(batch_size)
+        ).scalars().all()
+        if not batch:
+            break
+        done += db.session.execute(db.delete(ContestantAnswer).where(ContestantAnswer.contestant_id.in_(batch))).rowcount
+        done += db.session.execute(db.delete(Contestant).where(Contestant.id.in_(batch))).rowcount
+        db.session.commit()
+        progress(done)
+
+    done += _delete_questions(quiz_id)
+    db.session.execute(db.delete(Quiz).where(Quiz.id == quiz_id))
+    db.session.commit()
+    progress(done)
+    _forget(quiz_id)
+
+
+def _forget(quiz_id):
+    leaderboard.get_store().invalidate(quiz_id)
+    quiz_payload.forget(quiz_id)
+    dashboard_stats.invalidate() # Bulk deletes bypass the session's change tracking
+
+
+def delete_quiz(quiz, user_id=None):
+    """
+    Deletes a quiz inline when it is small, or hands it to a background job when
+    it has more than QUIZ_DELETE_BACKGROUND_THRESHOLD rows under it. Returns the
+    job, or None when the quiz is already gone.
+    """
+    total = count_rows(quiz.id)
+    if total <= current_app.config.get('QUIZ_DELETE_BACKGROUND_THRESHOLD', 5000):
+        delete_quiz_now(quiz.id)
+        db.session.commit()
+        _forget(quiz.id)
+        return None
+
+    # Hide it from moderators straight away; the rows disappear as the job runs
+    quiz.is_active = False
+    return jobs.submit('delete_quiz', quiz.id, delete_quiz_in_batches, quiz.id,
+                       current_app.config.get('QUIZ_DELETE_BATCH_SIZE', 1000),
+                       total=total, created_by=user_id)
@@ -0,0 +1,75 @@
+# app/services/quiz_payload.py
+
+from flask import current_app
+from app import db
+from app.models.quiz import Quiz, Question
+from app.services.cache import TTLCache
+
+
+def init_app(app):
+    app.extensions['quiz_payloads'] = TTLCache(maxsize=app.config.get('QUIZ_PAYLOAD_CACHE_SIZE', 128))
+
+
+def _cache():
+    return current_app.extensions['quiz_payloads']
+
+
+def questions_query(quiz_id):
+    """The columns a session payload is built from, in session order."""
+    return db.select(Question.id, Question.question_text, Question.option_a, Question.option_b,
+                     Question.option_c, Question.option_d, Question.correct_answer) \
+             .where(Question.quiz_id == quiz_id) \
+             .order_by(Question.id.asc())
+
+
+def _build(quiz):
+    questions = db.session.execute(questions_query(quiz.id)).all()
+    return {
+        'quiz_id': quiz.id,
+        'title': quiz.title,
+        'version': quiz.content_version,
+        'questions': [{'id': q.id, 'text': q.question_text, 'options': {'a': q.option_a, 'b': q.option_b, 'c': q.option_c, 'd': q.option_d}, 'correct_answer': q.correct_answer} for q in questions]
+    }
+
+
+def get_quiz_payload(quiz):
+    """
+    Returns the question payload for a live session, built at most once per
+    quiz content version. The version lives in the database, so every worker
+    process sees an edit even though each keeps its own cache.
+    """
+    return _cache().get_or_set((quiz.id, quiz.content_version), lambda: _build(quiz))
+
+
+def question_window(quiz, start, count):
+    """
+    A slice of the session's questions, as served to the session page while
+    the moderator moves through the quiz. Windows come from the cached payload,
+    so paging costs no queries once a version has been built.
+    """
+    questions = get_quiz_payload(quiz)['questions']
+    return {
+        'quiz_id': quiz.id,
+        'version': quiz.content_version,
+        'total': len(questions),
+        'start': start,
+        'questions': questions[start:start + count]
+    }
+
+
+def window_etag(quiz, start, count):
+    return f'q{quiz.id}-v{quiz.content_version}-{start}-{count}'
+
+
+def invalidate(quiz):
+    """
+    Marks the quiz's questions as changed. Bumps the stored content version
+    (committed with the caller's transaction) and drops this process's copies.
+    """
+    quiz.content_version = Quiz.content_version + 1
+    forget(quiz.id)
+
+
+def forget(quiz_id):
+    """Drops this process's cached payloads for a quiz, e.g. once it is deleted."""
+    _cache().discard_where(lambda key: key[0] == quiz_id)
@@ -0,0 +1,32 @@
+# app/services/warmup.py
+
+import logging
+from app import db
+
+logger = logging.getLogger(__name__)
+
+
+def after_fork(app, connections):
+    """
+    Prepares a freshly forked worker. The engines' pools were created in the
+    parent before the fork; any connection they hold is shared with it and must
+    not be used here, so the pools are replaced (without closing the parent's
+    sockets) and then pre-filled with up to `connections` connections per
+    engine, so the first requests do not pay for connection setup.
+    """
+    with app.app_context():
+        for key, engine in db.engines.items():
+            engine.dispose(close=False)
+            size = engine.pool.size() if hasattr(engine.pool, 'size') else 1
+            opened = []
+            try:
+                for _ in range(min(connections, size)):
+                    conn = engine.connect()
+                    opened.append(conn)
+                    conn.exec_driver_sql('SELECT 1')
+            except Exception:
+                # Not fatal: the pool connects lazily and /readyz reports the outage
+                logger.warning('Could not warm the %s connection pool', key or 'primary', exc_info=True)
+            finally:
+                for conn in opened:
+                    conn.close() # Returns it to the pool
@@ -0,0 +1,47 @@
+# benchmarks/dataset.py
+
+from datetime import datetime
+from app import db
+from app.models.user import User, Role
+import seeder
+
+BENCH_PASSWORD = 'benchpass'
+
+
+class Sizes:
+    def __init__(self, quizzes=3, questions=40, contestants=300, fill=0.75):
+        self.quizzes = quizzes
+        self.questions = questions # per quiz
+        self.contestants = contestants # per quiz
+        self.fill = fill # share of questions each contestant answered
+
+    def as_dict(self):
+        return {'quizzes': self.quizzes, 'questions': self.questions,
+                'contestants': self.contestants, 'fill': self.fill}
+
+
+def reset_schema():
+    seeder.reset_schema()
+
+
+def seed(sizes, seed_value=1):
+    """
+    Fills an empty schema with the benchmark accounts and the seeder's
+    synthetic quizzes. The same seed always produces the same data on a given
+    day; quiz dates are anchored at today's midnight so about half of them are
+    upcoming, as the admin dashboard expects.
+    """
+    password = seeder.get_hasher().hash_password(BENCH_PASSWORD) # One hash shared by both accounts
+    roles = {name: Role(name=name) for name in ('superadmin', 'admin', 'moderator')}
+    db.session.add_all(roles.values())
+    db.session.flush()
+    admin = User(username='bench_admin', email='bench_admin@example.com', password=password, role=roles['admin'])
+    moderator = User(username='bench_mod', email='bench_mod@example.com', password=password, role=roles['moderator'])
+    db.session.add_all([admin, moderator])
+    db.session.commit()
+
+    quiz_ids = seeder.generate_quizzes(admin.id, sizes.quizzes, sizes.questions, sizes.contestants, sizes.fill,
+                                       seed=seed_value,
+                                       base_date=datetime.now().replace(hour=0, minute=0, second=0, microsecond=0),
+                                       echo=lambda message: None)
+    return {'quiz_ids': quiz_ids, 'admin': admin.username, 'moderator': moderator.username}
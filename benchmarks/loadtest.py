@@ -0,0 +1,420 @@
+# benchmarks/loadtest.py
+"""
+Live-session load simulator for BrainStorm.
+
+Drives a running deployment the way a room full of moderators does: each
+simulated session logs in as its own moderator, opens quiz_session, then walks
+the questions in order, loading them a window at a time as the page does. On
+every question it records a burst of answers for its contestants (with a pause
+in between, as a moderator reads the next one out) and finally submits each
+contestant's quiz. Every client is an asyncio task on plain keep-alive
+HTTP/1.1 connections, so one process can hold hundreds of sessions.
+
+    python seeder.py --quizzes 4 --questions 30 --contestants 400 --fill 0 --moderators 50
+    python run.py &
+    python -m benchmarks.loadtest --base-url http://127.0.0.1:5000 --sessions 50
+
+DATABASE_URL must point at the database the server uses: the tool reads the
+quiz layout from it up front and, once the run is over, checks that every
+answer it got acknowledged is the one stored and that every touched
+contestant's score equals the number of correct answers stored for them.
+Sessions sharing a quiz get disjoint sets of contestants so the expected
+final state is well defined.
+
+Reports throughput, p50/p95/p99 latency and error rate per endpoint, and exits
+non-zero when the error rate passes --max-error-rate or a check fails.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit, urlencode
+
+from benchmarks.run import BENCH_DIR, percentile
+
+
+class HTTPError(Exception):
+    pass
+
+
+class Connection:
+    """A single keep-alive HTTP/1.1 connection, reopened when the server closes it."""
+
+    def __init__(self, host, port, timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+
+    async def _open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+            self.reader = self.writer = None
+
+    async def request(self, method, path, headers, body=b''):
+        if self.writer is None:
+            await self._open()
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {self.host}:{self.port}', f'Content-Length: {len(body)}']
+        lines.extend(f'{name}: {value}' for name, value in headers.items())
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        try:
+            return await asyncio.wait_for(self._read_response(), self.timeout)
+        except BaseException:
+            await self.close() # The stream position is unknown; never reuse it
+            raise
+
+    async def _read_response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise HTTPError('Connection closed by server')
+        status = int(status_line.split(None, 2)[1])
+        headers = []
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers.append((name.strip().lower(), value.strip()))
+        fields = dict(headers)
+
+        if fields.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            body = b''.join(chunks)
+        elif 'content-length' in fields:
+            body = await self.reader.readexactly(int(fields['content-length']))
+        else:
+            body = await self.reader.read() # Delimited by close
+
+        if fields.get('connection', '').lower() == 'close' or 'content-length' not in fields and 'transfer-encoding' not in fields:
+            await self.close()
+        return status, headers, body
+
+
+class Client:
+    """
+    One simulated moderator: a cookie jar shared by a few keep-alive
+    connections, like the handful a browser opens per host.
+    """
+
+    def __init__(self, base_url, connections, timeout, stats):
+        parts = urlsplit(base_url)
+        self.prefix = parts.path.rstrip('/')
+        self.cookies = {}
+        self.stats = stats
+        self.pool = asyncio.Queue()
+        self.connections = [Connection(parts.hostname, parts.port or 80, timeout) for _ in range(connections)]
+        for connection in self.connections:
+            self.pool.put_nowait(connection)
+
+    async def close(self):
+        for connection in self.connections:
+            await connection.close()
+
+    async def request(self, name, method, path, form=None, payload=None):
+        """Sends a request, recording its latency under name. Returns (status, body)."""
+        headers = {'Accept': 'application/json, text/html'}
+        body = b''
+        if form is not None:
+            body = urlencode(form).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        elif payload is not None:
+            body = json.dumps(payload).encode()
+            headers['Content-Type'] = 'application/json'
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{k}={v}' for k, v in self.cookies.items())
+
+        connection = await self.pool.get()
+        started = time.perf_counter()
+        try:
+            status, response_headers, response_body = await connection.request(method, self.prefix + path, headers, body)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, HTTPError, ValueError) as e:
+            self.stats.record(name, time.perf_counter() - started, None, type(e).__name__)
+            return None, b''
+        finally:
+            self.pool.put_nowait(connection)
+
+        self.stats.record(name, time.perf_counter() - started, status)
+        for header, value in response_headers:
+            if header == 'set-cookie':
+                for key, morsel in SimpleCookie(value).items():
+                    self.cookies[key] = morsel.value
+        return status, response_body
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = {} # endpoint -> [seconds]
+        self.errors = {} # endpoint -> {reason: count}
+        self.started = None
+        self.finished = None
+
+    def record(self, name, seconds, status, failure=None):
+        self.latencies.setdefault(name, []).append(seconds)
+        if failure is None and status is not None and status >= 400:
+            failure = f'HTTP {status}'
+        if failure is not None:
+            reasons = self.errors.setdefault(name, {})
+            reasons[failure] = reasons.get(failure, 0) + 1
+
+    def total_requests(self):
+        return sum(len(values) for values in self.latencies.values())
+
+    def total_errors(self):
+        return sum(sum(reasons.values()) for reasons in self.errors.values())
+
+    def report(self):
+        elapsed = self.finished - self.started
+        print(f"\n{'endpoint':<34}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        for name in sorted(self.latencies):
+            values = sorted(self.latencies[name])
+            errors = sum(self.errors.get(name, {}).values())
+            print(f"{name:<34}{len(values):>9}{errors:>8}{len(values) / elapsed:>9.1f}"
+                  f"{percentile(values, 0.50) * 1000:>9.1f}{percentile(values, 0.95) * 1000:>9.1f}"
+                  f"{percentile(values, 0.99) * 1000:>9.1f}")
+        total = self.total_requests()
+        print(f'\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s), '
+              f'error rate {self.error_rate():.2%}')
+        for name, reasons in sorted(self.errors.items()):
+            print(f"  {name}: " + ', '.join(f'{reason} x{count}' for reason, count in sorted(reasons.items())))
+
+    def error_rate(self):
+        total = self.total_requests()
+        return self.total_errors() / total if total else 0.0
+
+
+class Session:
+    """The plan and client-side record of one simulated live session."""
+
+    def __init__(self, number, username, quiz_id, question_ids, contestant_ids):
+        self.number = number
+        self.username = username
+        self.quiz_id = quiz_id
+        self.question_ids = question_ids
+        self.contestant_ids = contestant_ids
+        self.acknowledged = {} # (contestant_id, question_id) -> option the server confirmed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Simulate concurrent live quiz sessions against a running BrainStorm.')
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--sessions', type=int, default=10, help='Concurrent moderators, one live session each.')
+    parser.add_argument('--username-prefix', default='moderator', help='Sessions log in as <prefix>1..<prefix>N.')
+    parser.add_argument('--password', default='loadtest', help='Password of the moderator accounts (seeder.py uses loadtest).')
+    parser.add_argument('--quiz-id', type=int, action='append', help='Quizzes to run sessions on (repeatable; default: the latest active ones).')
+    parser.add_argument('--contestants', type=int, default=20, help='Contestants each session answers for.')
+    parser.add_argument('--questions', type=int, default=0, help='Questions each session walks through (0 = all).')
+    parser.add_argument('--window', type=int, default=5, help='Questions per quiz_questions fetch (QUIZ_SESSION_WINDOW).')
+    parser.add_argument('--connections', type=int, default=4, help='Keep-alive connections per session.')
+    parser.add_argument('--think-ms', type=float, default=500, help='Mean pause between questions.')
+    parser.add_argument('--ramp-up', type=float, default=5.0, help='Seconds over which sessions start.')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds.')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--skip-verify', action='store_true', help='Do not check the stored answers and scores afterwards.')
+    return parser.parse_args(argv)
+
+
+def build_app():
+    if not os.getenv('DATABASE_URL'):
+        raise SystemExit('Set DATABASE_URL to the database the server under test uses.')
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+    sys.path.insert(0, os.path.dirname(BENCH_DIR))
+    from app import create_app
+    return create_app()
+
+
+def plan_sessions(app, args):
+    """
+    Assigns each session a moderator account, a quiz and its own slice of that
+    quiz's contestants.
+    """
+    from app import db
+    from app.models.quiz import Quiz, Question, Contestant
+
+    with app.app_context():
+        quiz_ids = args.quiz_id
+        if not quiz_ids:
+            with_contestants = db.select(Contestant.quiz_id).distinct()
+            quiz_ids = db.session.scalars(
+                db.select(Quiz.id).where(Quiz.is_active == True, Quiz.id.in_(with_contestants))
+                  .order_by(Quiz.quiz_date.desc(), Quiz.id.desc()).limit(args.sessions)
+            ).all()
+        if not quiz_ids:
+            raise SystemExit('No active quiz with contestants found; seed one with seeder.py --quizzes.')
+
+        layout = {}
+        for quiz_id in quiz_ids:
+            questions = db.session.scalars(db.select(Question.id).where(Question.quiz_id == quiz_id).order_by(Question.id)).all()
+            contestants = db.session.scalars(db.select(Contestant.id).where(Contestant.quiz_id == quiz_id).order_by(Contestant.id)).all()
+            if args.questions:
+                questions = questions[:args.questions]
+            layout[quiz_id] = (questions, contestants)
+
+    sessions, offsets = [], dict.fromkeys(quiz_ids, 0)
+    for number in range(args.sessions):
+        quiz_id = quiz_ids[number % len(quiz_ids)]
+        questions, contestants = layout[quiz_id]
+        start = offsets[quiz_id]
+        offsets[quiz_id] += args.contestants
+        if start >= len(contestants):
+            raise SystemExit(f'Quiz {quiz_id} has {len(contestants)} contestants, too few for '
+                             f'{args.sessions} sessions of {args.contestants}; add quizzes or contestants.')
+        sessions.append(Session(number + 1, f'{args.username_prefix}{number + 1}', quiz_id,
+                                questions, contestants[start:start + args.contestants]))
+    return sessions
+
+
+async def run_session(session, args, stats, rnd):
+    await asyncio.sleep(rnd.uniform(0, args.ramp_up))
+    client = Client(args.base_url, args.connections, args.timeout, stats)
+    try:
+        status, _ = await client.request('auth.login', 'POST', '/auth/login',
+                                         form={'username': session.username, 'password': args.password})
+        if status != 302:
+            print(f'Session {session.number}: login as {session.username} failed ({status})', file=sys.stderr)
+            return
+        await client.request('moderator.quiz_session', 'GET', f'/moderator/quiz_session/{session.quiz_id}')
+
+        for index, question_id in enumerate(session.question_ids):
+            if index % args.window == 0: # The session page loads questions a window at a time
+                await client.request('moderator.quiz_questions', 'GET',
+                                     f'/moderator/quiz_session/{session.quiz_id}/questions?start={index}&count={args.window}')
+            # A burst: the moderator clicks an answer for every contestant in quick succession
+            burst = []
+            for contestant_id in session.contestant_ids:
+                option = rnd.choice('abcd')
+                burst.append(_answer(client, session, contestant_id, question_id, option))
+                if rnd.random() < 0.05: # Occasionally corrects a mis-click straight away
+                    burst.append(_answer(client, session, contestant_id, question_id, rnd.choice('abcd')))
+            await _in_order_per_pair(burst)
+            await asyncio.sleep(rnd.expovariate(1000.0 / args.think_ms) if args.think_ms > 0 else 0)
+
+        await asyncio.gather(*[
+            client.request('moderator.submit_quiz_completion', 'POST', '/moderator/submit_quiz_completion',
+                           payload={'contestant_id': contestant_id})
+            for contestant_id in session.contestant_ids
+        ])
+    finally:
+        await client.close()
+
+
+def _answer(client, session, contestant_id, question_id, option):
+    """An unstarted record_answer call for one pair, kept as (pair, coroutine factory)."""
+    async def send():
+        status, body = await client.request('moderator.record_answer', 'POST', '/moderator/record_answer', payload={
+            'quiz_id': session.quiz_id, 'contestant_id': contestant_id,
+            'question_id': question_id, 'selected_option': option
+        })
+        if status == 200:
+            session.acknowledged[(contestant_id, question_id)] = option
+    return (contestant_id, question_id), send
+
+
+async def _in_order_per_pair(calls):
+    """
+    Runs the burst concurrently, but sends repeated clicks on one pair one
+    after another, as the same button on one screen would, so the last
+    acknowledged option is the one that should be stored.
+    """
+    chains = {}
+    for pair, send in calls:
+        chains.setdefault(pair, []).append(send)
+
+    async def chain(sends):
+        for send in sends:
+            await send()
+    await asyncio.gather(*[chain(sends) for sends in chains.values()])
+
+
+def verify(app, sessions):
+    """Returns a list of human-readable mismatches between the run and the database."""
+    from app import db
+    from app.models.quiz import Question, Contestant, ContestantAnswer
+
+    problems = []
+    with app.app_context():
+        for session in sessions:
+            if not session.contestant_ids:
+                continue
+            stored = {(row.contestant_id, row.question_id): row.selected_option for row in db.session.execute(
+                db.select(ContestantAnswer.contestant_id, ContestantAnswer.question_id, ContestantAnswer.selected_option)
+                  .where(ContestantAnswer.contestant_id.in_(session.contestant_ids))
+            )}
+            for pair, option in session.acknowledged.items():
+                if stored.get(pair) != option:
+                    problems.append(f'contestant {pair[0]} question {pair[1]}: sent {option!r}, stored {stored.get(pair)!r}')
+
+            correct = db.select(db.func.count(ContestantAnswer.id)) \
+                        .join(Question, Question.id == ContestantAnswer.question_id) \
+                        .where(ContestantAnswer.contestant_id == Contestant.id,
+                               ContestantAnswer.selected_option == Question.correct_answer) \
+                        .scalar_subquery()
+            for contestant_id, score, expected in db.session.execute(
+                db.select(Contestant.id, Contestant.score, correct).where(Contestant.id.in_(session.contestant_ids))
+            ):
+                if score != expected:
+                    problems.append(f'contestant {contestant_id}: score {score}, {expected} correct answers stored')
+    return problems
+
+
+async def simulate(sessions, args, stats):
+    rnd = random.Random(args.seed)
+    stats.started = time.perf_counter()
+    await asyncio.gather(*[run_session(session, args, stats, random.Random(rnd.random())) for session in sessions])
+    stats.finished = time.perf_counter()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    app = build_app()
+    sessions = plan_sessions(app, args)
+    print(f'{len(sessions)} sessions on quizzes {sorted({s.quiz_id for s in sessions})}, '
+          f'{args.contestants} contestants each, against {args.base_url} ...')
+
+    stats = Stats()
+    asyncio.run(simulate(sessions, args, stats))
+    stats.report()
+
+    failures = []
+    if stats.error_rate() > args.max_error_rate:
+        failures.append(f'error rate {stats.error_rate():.2%} exceeds {args.max_error_rate:.2%}')
+    if not args.skip_verify:
+        problems = verify(app, sessions)
+        checked = sum(len(s.acknowledged) for s in sessions)
+        print(f'\nChecked {checked} acknowledged answers and {sum(len(s.contestant_ids) for s in sessions)} scores: '
+              f'{len(problems)} mismatches')
+        for problem in problems[:20]:
+            print(f'  {problem}')
+        if problems:
+            failures.append(f'{len(problems)} answers or scores do not match')
+
+    if failures:
+        print('\nFAILED')
+        for failure in failures:
+            print(f'  {failure}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
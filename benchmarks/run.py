@@ -0,0 +1,243 @@
+# benchmarks/run.py
+"""
+Route benchmarks for BrainStorm.
+
+Seeds a synthetic dataset (generated by seeder.py) into a scratch database, then drives the main routes
+through the Flask test client and reports latency percentiles and SQL
+statement counts per route. Exits non-zero when a route issues more statements
+than its budget in benchmarks/budgets.json, or when its p95 latency regresses
+past --max-regression against a saved baseline.
+
+    python -m benchmarks.run --contestants 1000 --questions 50
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+
+The database defaults to a SQLite file in the system temp directory; point
+--database at a scratch PostgreSQL database to measure the production setup.
+Its tables are dropped and rebuilt unless --reuse is given.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BUDGETS = os.path.join(BENCH_DIR, 'budgets.json')
+# Latency changes smaller than this are treated as noise when comparing to a baseline
+MIN_REGRESSION_MS = 2.0
+
+
+class Scenario:
+    def __init__(self, name, user, method, path, payload=None):
+        self.name = name
+        self.user = user # 'admin' or 'moderator'
+        self.method = method
+        self.path = path # callable(context) -> URL
+        self.payload = payload # callable(context, rnd) -> JSON body
+
+
+def _random_answer(context, rnd):
+    return {'contestant_id': rnd.choice(context['contestant_ids']),
+            'question_id': rnd.choice(context['question_ids']),
+            'selected_option': rnd.choice('abcd')}
+
+
+SCENARIOS = [
+    Scenario('moderator.dashboard', 'moderator', 'GET', lambda c: '/moderator/dashboard'),
+    Scenario('moderator.quiz_session', 'moderator', 'GET', lambda c: f"/moderator/quiz_session/{c['quiz_id']}"),
+    Scenario('moderator.quiz_questions', 'moderator', 'GET', lambda c: f"/moderator/quiz_session/{c['quiz_id']}/questions?start=0&count=5"),
+    Scenario('moderator.record_answer', 'moderator', 'POST', lambda c: '/moderator/record_answer', _random_answer),
+    Scenario('moderator.quiz_results', 'moderator', 'GET', lambda c: f"/moderator/quiz_results/{c['quiz_id']}"),
+    Scenario('admin.dashboard', 'admin', 'GET', lambda c: '/admin/dashboard'),
+]
+
+
+class StatementCounter:
+    """Counts SQL statements sent on every engine the app uses."""
+
+    def __init__(self, engines):
+        self._count = 0
+        self._lock = threading.Lock()
+        from sqlalchemy import event
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        with self._lock:
+            self._count += 1
+
+    def take(self):
+        with self._lock:
+            count, self._count = self._count, 0
+        return count
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark BrainStorm routes against a synthetic dataset.')
+    parser.add_argument('--database', default=f"sqlite:///{os.path.join(tempfile.gettempdir(), 'brainstorm_bench.db')}",
+                        help='Scratch database URL (its tables are dropped).')
+    parser.add_argument('--reuse', action='store_true', help='Keep the existing data instead of reseeding.')
+    parser.add_argument('--quizzes', type=int, default=3)
+    parser.add_argument('--questions', type=int, default=40, help='Questions per quiz.')
+    parser.add_argument('--contestants', type=int, default=300, help='Contestants per quiz.')
+    parser.add_argument('--fill', type=float, default=0.75, help='Share of questions each contestant answered.')
+    parser.add_argument('--iterations', type=int, default=50, help='Measured requests per route.')
+    parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per route.')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--route', action='append', help='Only run these routes (repeatable).')
+    parser.add_argument('--budgets', default=DEFAULT_BUDGETS, help='JSON file of per-route statement budgets.')
+    parser.add_argument('--baseline', help='Results JSON to compare p95 latency against.')
+    parser.add_argument('--max-regression', type=float, default=0.25, help='Allowed p95 slowdown vs the baseline (0.25 = 25%%).')
+    parser.add_argument('--save-baseline', help='Write this run\'s results to a JSON file.')
+    return parser.parse_args(argv)
+
+
+def build_app(database_url):
+    # Benchmarks measure the routes, not bcrypt, and must not spawn hashing workers
+    os.environ['DATABASE_URL'] = database_url
+    os.environ.setdefault('BCRYPT_LOG_ROUNDS', '4')
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+    sys.path.insert(0, os.path.dirname(BENCH_DIR))
+    from app import create_app
+    app = create_app()
+    app.config['TESTING'] = True
+    return app
+
+
+def prepare_data(app, args):
+    from app import db
+    from app.models.quiz import Quiz, Question, Contestant
+    from benchmarks import dataset
+
+    with app.app_context():
+        if not args.reuse:
+            sizes = dataset.Sizes(args.quizzes, args.questions, args.contestants, args.fill)
+            print(f'Seeding {sizes.as_dict()} into {args.database} ...')
+            started = time.perf_counter()
+            dataset.reset_schema()
+            dataset.seed(sizes, seed_value=args.seed)
+            print(f'Seeded in {time.perf_counter() - started:.1f}s')
+
+        # Benchmark the busiest quiz
+        quiz_id = db.session.query(Contestant.quiz_id).group_by(Contestant.quiz_id) \
+                            .order_by(db.func.count(Contestant.id).desc()).limit(1).scalar()
+        if quiz_id is None:
+            raise SystemExit('The database has no contestants; run without --reuse to seed it.')
+        return {
+            'quiz_id': quiz_id,
+            'question_ids': db.session.scalars(db.select(Question.id).where(Question.quiz_id == quiz_id)).all(),
+            'contestant_ids': db.session.scalars(db.select(Contestant.id).where(Contestant.quiz_id == quiz_id)).all(),
+            'quizzes': db.session.query(db.func.count(Quiz.id)).scalar()
+        }
+
+
+def login(app, username):
+    from benchmarks.dataset import BENCH_PASSWORD
+    client = app.test_client()
+    response = client.post('/auth/login', data={'username': username, 'password': BENCH_PASSWORD})
+    if response.status_code != 302:
+        raise SystemExit(f'Could not log in as {username} (status {response.status_code}).')
+    return client
+
+
+def run_scenario(client, scenario, context, counter, args, rnd):
+    latencies, statements = [], []
+    for i in range(args.warmup + args.iterations):
+        kwargs = {'json': scenario.payload(context, rnd)} if scenario.payload else {}
+        counter.take()
+        started = time.perf_counter()
+        response = client.open(scenario.path(context), method=scenario.method, **kwargs)
+        response.get_data() # Drain streamed bodies inside the timing
+        elapsed = (time.perf_counter() - started) * 1000
+        count = counter.take()
+        if response.status_code != 200:
+            raise SystemExit(f'{scenario.name} returned {response.status_code}')
+        if i >= args.warmup:
+            latencies.append(elapsed)
+            statements.append(count)
+    latencies.sort()
+    return {
+        'iterations': len(latencies),
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'max_ms': round(latencies[-1], 2),
+        'queries_max': max(statements),
+        'queries_mean': round(sum(statements) / len(statements), 2)
+    }
+
+
+def check(results, budgets, baseline, max_regression):
+    """Returns a list of human-readable failures."""
+    failures = []
+    for name, result in results.items():
+        budget = budgets.get(name, {}).get('max_queries')
+        if budget is not None and result['queries_max'] > budget:
+            failures.append(f"{name}: {result['queries_max']} SQL statements exceeds the budget of {budget}")
+        previous = (baseline or {}).get(name)
+        if previous:
+            allowed = previous['p95_ms'] * (1 + max_regression)
+            if result['p95_ms'] > allowed and result['p95_ms'] - previous['p95_ms'] > MIN_REGRESSION_MS:
+                failures.append(f"{name}: p95 {result['p95_ms']}ms regressed past {allowed:.2f}ms "
+                                f"(baseline {previous['p95_ms']}ms)")
+    return failures
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    app = build_app(args.database)
+    context = prepare_data(app, args)
+
+    from app import db
+    with app.app_context():
+        counter = StatementCounter(db.engines.values())
+    clients = {'admin': login(app, 'bench_admin'), 'moderator': login(app, 'bench_mod')}
+
+    rnd = random.Random(args.seed)
+    results = {}
+    print(f"\n{'route':<28}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}")
+    for scenario in SCENARIOS:
+        if args.route and scenario.name not in args.route:
+            continue
+        result = run_scenario(clients[scenario.user], scenario, context, counter, args, rnd)
+        results[scenario.name] = result
+        print(f"{scenario.name:<28}{result['p50_ms']:>9}{result['p95_ms']:>9}{result['p99_ms']:>9}{result['queries_max']:>9}")
+
+    with open(args.budgets) as f:
+        budgets = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['routes']
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({'database': app.config['SQLALCHEMY_DATABASE_URI'].split(':', 1)[0],
+                       'sizes': {k: getattr(args, k) for k in ('quizzes', 'questions', 'contestants', 'fill')},
+                       'routes': results}, f, indent=2)
+        print(f'\nSaved results to {args.save_baseline}')
+
+    failures = check(results, budgets, baseline, args.max_regression)
+    if failures:
+        print('\nFAILED')
+        for failure in failures:
+            print(f'  {failure}')
+        return 1
+    print('\nAll routes within budget.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
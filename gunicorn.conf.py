@@ -0,0 +1,56 @@
+# gunicorn.conf.py
+"""
+Production server settings:
+
+    flask db upgrade
+    gunicorn -c gunicorn.conf.py
+
+The app is imported once in the master (preload_app) and forked into
+WEB_CONCURRENCY worker processes of WEB_THREADS threads each.
+
+The default is a single worker with many threads. Live session events go
+through EVENT_BROKER, and the default in-process broker only reaches screens
+connected to the worker that recorded the answer, so with several workers
+most screens would silently stop updating. Startup is refused when
+WEB_CONCURRENCY > 1 with a process-local broker; configure a cross-process
+broker first. The leaderboard cache is also per process and converges within
+LEADERBOARD_TTL_SECONDS, and so is the logged-in user cache: with several
+workers, role changes and account deletes can take up to
+IDENTITY_CACHE_TTL_SECONDS to apply everywhere (0 disables that cache).
+
+Every open quiz session screen holds one thread for its event stream, so size
+WEB_CONCURRENCY x WEB_THREADS above the number of screens expected. Streams do
+not hold database connections; the other threads share DB_POOL_SIZE +
+DB_MAX_OVERFLOW connections per worker.
+"""
+
+import os
+
+wsgi_app = 'wsgi:app'
+bind = os.getenv('BIND', f"0.0.0.0:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv('WEB_CONCURRENCY', '1'))
+worker_class = 'gthread'
+threads = int(os.getenv('WEB_THREADS', '32'))
+preload_app = True
+timeout = int(os.getenv('WEB_TIMEOUT', '30')) # Seconds a silent worker lives before it is restarted
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('WEB_KEEPALIVE', '5'))
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', '0')) # Recycle workers after this many requests (0 = never)
+max_requests_jitter = int(os.getenv('WEB_MAX_REQUESTS_JITTER', '0'))
+accesslog = os.getenv('WEB_ACCESS_LOG', '-')
+errorlog = '-'
+
+
+def on_starting(server):
+    from app.services import events
+    if server.cfg.workers > 1 and not events.reaches_all_workers(server.app.wsgi()):
+        message = (f'{server.cfg.workers} workers with a process-local EVENT_BROKER: live session screens '
+                   f'would only see events from their own worker. Set EVENT_BROKER to a cross-process '
+                   f'broker or run WEB_CONCURRENCY=1.')
+        server.log.error(message)
+        raise SystemExit(message)
+
+
+def post_fork(server, worker):
+    from app.services import warmup
+    warmup.after_fork(worker.app.wsgi(), connections=threads)
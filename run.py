@@ -1,5 +1,6 @@
 import os
 from app import create_app, db
+from app.services import migrations
 from app.models.user import User, Role
 from app.models.quiz import Quiz, Question, Contestant
 from dotenv import load_dotenv
@@ -14,6 +15,6 @@ def make_shell_context():
 
 if __name__ == '__main__':
     with app.app_context():
-        db.create_all() # Create database tables
+        migrations.upgrade(echo=print) # Create or upgrade database tables (see `flask db status`)
         # Initial seeding if needed (can be run via seeder.py)
     app.run(debug=os.getenv('FLASK_DEBUG', 'True') == 'True') # Set FLASK_DEBUG in .env or shell
@@ -1,21 +1,42 @@
-import os
+"""
+Seeds the database with the default accounts and a sample quiz, and optionally
+with a deterministic synthetic dataset for load testing:
+
+    python seeder.py
+    python seeder.py --quizzes 20 --questions 50 --contestants 5000 --fill 0.8 --moderators 50
+
+The same --seed always generates the same data. Rows go in with bulk inserts
+committed per quiz, so millions of answers take minutes rather than hours.
+"""
+
+import time
+import random
+import argparse
 from app import create_app, db
 from app.models.user import User, Role
-from app.models.quiz import Quiz, Question, Contestant
+from app.models.quiz import Quiz, Question, Contestant, ContestantAnswer
 from datetime import datetime, timedelta
-from flask_bcrypt import Bcrypt
+from app.services import migrations, question_stats
+from app.services.hashing import get_hasher
 from dotenv import load_dotenv
 
 load_dotenv() # Load environment variables
 
-app = create_app()
-bcrypt = Bcrypt(app)
+SYNTHETIC_PASSWORD = 'loadtest' # Shared by every generated moderator account
+BATCH_SIZE = 10000 # Rows per INSERT batch
+# Default anchor for synthetic dates; they are offsets from it, never the clock
+BASE_DATE = datetime(2025, 1, 6, 9, 0)
 
-def seed_data():
+def reset_schema():
+    """Drops every table and rebuilds the schema through the migrations."""
+    db.drop_all() # Drop all tables to ensure clean slate
+    migrations.schema_version.drop(db.engine, checkfirst=True)
+    migrations.upgrade() # Recreate all tables
+
+def seed_data(app):
     with app.app_context():
         print("Seeding database...")
-        db.drop_all() # Drop all tables to ensure clean slate
-        db.create_all() # Recreate all tables
+        reset_schema()
 
         # Create Roles
         superadmin_role = Role.query.filter_by(name='superadmin').first()
@@ -38,21 +59,21 @@ def seed_data():
         # Superadmin
         superadmin_user = User.query.filter_by(username='superadmin').first()
         if not superadmin_user:
-            hashed_password = bcrypt.generate_password_hash('superpass').decode('utf-8')
+            hashed_password = get_hasher().hash_password('superpass')
             superadmin_user = User(username='superadmin', email='superadmin@example.com', password=hashed_password, role=superadmin_role)
             db.session.add(superadmin_user)
 
         # Admin
         admin_user = User.query.filter_by(username='adminuser').first()
         if not admin_user:
-            hashed_password = bcrypt.generate_password_hash('adminpass').decode('utf-8')
+            hashed_password = get_hasher().hash_password('adminpass')
             admin_user = User(username='adminuser', email='admin@example.com', password=hashed_password, role=admin_role)
             db.session.add(admin_user)
 
         # Moderator
         mod_user = User.query.filter_by(username='moduser').first()
         if not mod_user:
-            hashed_password = bcrypt.generate_password_hash('modpass').decode('utf-8')
+            hashed_password = get_hasher().hash_password('modpass')
             mod_user = User(username='moduser', email='moderator@example.com', password=hashed_password, role=moderator_role)
             db.session.add(mod_user)
         db.session.commit()
@@ -93,5 +114,130 @@ def seed_data():
 
         print("Seeding complete.")
 
+def _bulk_insert(model, rows, batch_size=BATCH_SIZE):
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(db.insert(model), rows[start:start + batch_size])
+
+def generate_moderators(count, password_hash):
+    """Adds moderator1..moderatorN, all sharing one precomputed password hash."""
+    role = Role.query.filter_by(name='moderator').one()
+    _bulk_insert(User, [{
+        'username': f'moderator{i}', 'email': f'moderator{i}@example.com',
+        'password': password_hash, 'role_id': role.id
+    } for i in range(1, count + 1)])
+    db.session.commit()
+
+def generate_quizzes(admin_id, quizzes, questions, contestants, fill, seed=1, batch_size=BATCH_SIZE,
+                     base_date=BASE_DATE, echo=print):
+    """
+    Generates quizzes with questions, contestants and answers. Each question is
+    answered by each contestant with probability fill; contestants who answered
+    everything are marked as submitted. Scores are then set with one UPDATE
+    per quiz and the question counters rebuilt in a single pass.
+
+    Quiz dates fall within 30 days of base_date, alternating after and before
+    it, so passing today leaves about half of them upcoming; the same seed and
+    base_date always give the same rows.
+    Returns the generated quiz ids.
+    """
+    rnd = random.Random(seed)
+    quiz_ids = []
+    total_answers = 0
+    started = time.perf_counter()
+
+    for number in range(1, quizzes + 1):
+        days = rnd.randint(1, 30) * (1 if number % 2 else -1) # Alternate upcoming and past quizzes
+        quiz = Quiz(title=f'Load Test Quiz {number}', description=f'Synthetic quiz {number} (seed {seed})',
+                    quiz_date=base_date + timedelta(days=days), admin_id=admin_id, created_at=base_date)
+        db.session.add(quiz)
+        db.session.flush()
+        quiz_ids.append(quiz.id)
+
+        _bulk_insert(Question, [{
+            'quiz_id': quiz.id, 'question_text': f'Quiz {number} question {i}?',
+            'option_a': f'Answer {i}A', 'option_b': f'Answer {i}B', 'option_c': f'Answer {i}C', 'option_d': f'Answer {i}D',
+            'correct_answer': rnd.choice('abcd'), 'created_at': base_date
+        } for i in range(1, questions + 1)], batch_size)
+        _bulk_insert(Contestant, [{
+            'quiz_id': quiz.id, 'name': f'Contestant {number}-{i}', 'email': f'contestant{number}_{i}@example.com', 'score': 0,
+            'created_at': base_date
+        } for i in range(1, contestants + 1)], batch_size)
+
+        question_rows = db.session.execute(db.select(Question.id, Question.correct_answer)
+                                             .where(Question.quiz_id == quiz.id).order_by(Question.id)).all()
+        contestant_ids = db.session.execute(db.select(Contestant.id)
+                                              .where(Contestant.quiz_id == quiz.id).order_by(Contestant.id)).scalars().all()
+
+        # Answers are generated and inserted a batch at a time to keep memory flat
+        answers, completed = [], []
+        for contestant_id in contestant_ids:
+            answered = 0
+            for question_id, correct_answer in question_rows:
+                if rnd.random() >= fill:
+                    continue
+                option = rnd.choice('abcd')
+                answers.append({'contestant_id': contestant_id, 'question_id': question_id,
+                                'selected_option': option, 'is_correct': option == correct_answer,
+                                'created_at': quiz.quiz_date})
+                answered += 1
+                if len(answers) >= batch_size:
+                    db.session.execute(db.insert(ContestantAnswer), answers)
+                    total_answers += len(answers)
+                    answers = []
+            if question_rows and answered == len(question_rows):
+                completed.append({'id': contestant_id, 'submitted_at': quiz.quiz_date + timedelta(hours=1)})
+        if answers:
+            db.session.execute(db.insert(ContestantAnswer), answers)
+            total_answers += len(answers)
+        if completed:
+            db.session.execute(db.update(Contestant), completed)
+
+        db.session.execute(
+            db.update(Contestant)
+              .where(Contestant.quiz_id == quiz.id)
+              .values(score=db.select(db.func.count(ContestantAnswer.id))
+                              .where(ContestantAnswer.contestant_id == Contestant.id, ContestantAnswer.is_correct == True)
+                              .scalar_subquery())
+              .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        elapsed = time.perf_counter() - started
+        echo(f'  quiz {number}/{quizzes}: {total_answers} answers so far ({total_answers / elapsed:,.0f} rows/s)')
+
+    question_stats.recompute()
+    db.session.commit()
+    return quiz_ids
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Seed the BrainStorm database.')
+    parser.add_argument('--quizzes', type=int, default=0, help='Synthetic quizzes to generate (default: none).')
+    parser.add_argument('--questions', type=int, default=30, help='Questions per synthetic quiz.')
+    parser.add_argument('--contestants', type=int, default=200, help='Contestants per synthetic quiz.')
+    parser.add_argument('--fill', type=float, default=0.8, help='Share of questions each contestant answers (0-1).')
+    parser.add_argument('--moderators', type=int, default=0, help=f"Extra moderator accounts (password '{SYNTHETIC_PASSWORD}').")
+    parser.add_argument('--seed', type=int, default=1, help='Random seed; the same seed gives the same data.')
+    parser.add_argument('--base-date', type=datetime.fromisoformat, default=BASE_DATE,
+                        help=f'Quiz dates fall within 30 days of this (ISO format, default {BASE_DATE.date()}).')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows per INSERT batch.')
+    args = parser.parse_args(argv)
+    if not 0 <= args.fill <= 1:
+        parser.error('--fill must be between 0 and 1.')
+
+    app = create_app()
+    seed_data(app)
+    if not (args.quizzes or args.moderators):
+        return
+    with app.app_context():
+        if args.moderators:
+            print(f"Generating {args.moderators} moderators...")
+            generate_moderators(args.moderators, get_hasher().hash_password(SYNTHETIC_PASSWORD))
+        if args.quizzes:
+            print(f"Generating {args.quizzes} quizzes x {args.questions} questions x {args.contestants} contestants (fill {args.fill})...")
+            admin = User.query.filter_by(username='adminuser').one()
+            generate_quizzes(admin.id, args.quizzes, args.questions, args.contestants, args.fill,
+                             seed=args.seed, batch_size=args.batch_size, base_date=args.base_date)
+        print("Synthetic data complete.")
+
 if __name__ == '__main__':
-    seed_data()
+    main()
@@ -0,0 +1,99 @@
+# tests/test_answer_concurrency.py
+"""
+Many moderators recording answers for the same contestant at once must not
+lose score updates or let the per-question counters drift.
+
+    python -m pytest tests
+"""
+
+import random
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+THREADS = 8
+ANSWERS_PER_THREAD = 40
+QUESTIONS = 20
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # A file-backed database so every thread gets its own connection
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'brainstorm.db'}")
+    monkeypatch.setenv('PASSWORD_HASH_WORKERS', '0')
+    monkeypatch.setenv('BCRYPT_LOG_ROUNDS', '4')
+    monkeypatch.setenv('INSTRUMENTATION_ENABLED', 'False')
+
+    from app import create_app, db
+    from app.services import migrations
+    from app.models.user import User, Role
+    from app.models.quiz import Quiz, Question, Contestant
+
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        migrations.upgrade()
+        role = Role(name='moderator')
+        admin_role = Role(name='admin')
+        db.session.add_all([role, admin_role])
+        db.session.flush()
+        admin = User(username='admin', email='admin@example.com', role=admin_role)
+        admin.set_password('password1')
+        moderator = User(username='mod', email='mod@example.com', role=role)
+        moderator.set_password('password1')
+        db.session.add_all([admin, moderator])
+        db.session.flush()
+        quiz = Quiz(title='Concurrency', description='', quiz_date=datetime.now(), admin_id=admin.id)
+        db.session.add(quiz)
+        db.session.flush()
+        db.session.add_all([
+            Question(quiz_id=quiz.id, question_text=f'Question {i}', option_a='a', option_b='b',
+                     option_c='c', option_d='d', correct_answer='abcd'[i % 4])
+            for i in range(QUESTIONS)
+        ])
+        db.session.add(Contestant(quiz_id=quiz.id, name='Target', email='target@example.com', score=0))
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+def _login(app):
+    client = app.test_client()
+    response = client.post('/auth/login', data={'username': 'mod', 'password': 'password1'})
+    assert response.status_code == 302
+    return client
+
+
+def test_concurrent_answers_keep_score_and_counters_exact(app):
+    from app import db
+    from app.models.quiz import Question, Contestant, ContestantAnswer
+    from app.services import question_stats
+
+    with app.app_context():
+        question_ids = db.session.scalars(db.select(Question.id).order_by(Question.id)).all()
+        contestant_id = db.session.scalars(db.select(Contestant.id)).one()
+
+    def hammer(seed):
+        rnd = random.Random(seed)
+        client = _login(app)
+        statuses = []
+        for _ in range(ANSWERS_PER_THREAD):
+            response = client.post('/moderator/record_answer', json={
+                'contestant_id': contestant_id,
+                'question_id': rnd.choice(question_ids),
+                'selected_option': rnd.choice('abcd')
+            })
+            statuses.append(response.status_code)
+        return statuses
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        results = list(pool.map(hammer, range(THREADS)))
+
+    assert all(status == 200 for statuses in results for status in statuses)
+    with app.app_context():
+        stored = db.session.scalars(db.select(ContestantAnswer).where(ContestantAnswer.contestant_id == contestant_id)).all()
+        assert len({answer.question_id for answer in stored}) == len(stored) # One row per question
+        assert db.session.get(Contestant, contestant_id).score == sum(1 for answer in stored if answer.is_correct)
+        assert question_stats.verify() == []
@@ -0,0 +1,72 @@
+# tests/test_assets.py
+"""
+The /assets route picks the precompressed variant from the client's
+Accept-Encoding, honouring quality values.
+
+    python -m pytest tests
+"""
+
+import gzip
+
+import pytest
+
+CSS = b'body { color: #333; }\n' * 50
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'brainstorm.db'}")
+    monkeypatch.setenv('INSTRUMENTATION_ENABLED', 'False')
+
+    from app import create_app
+    from app.services import assets
+
+    static = tmp_path / 'static'
+    (static / 'css').mkdir(parents=True)
+    (static / 'css' / 'site.css').write_bytes(CSS)
+
+    app = create_app()
+    app.config['TESTING'] = True
+    app.static_folder = str(static)
+    manifest = assets.build(app.static_folder, assets=('css/site.css',), echo=lambda message: None)
+    hashed = manifest['css/site.css']
+    # Stand-in brotli variant, so the choice is testable without the brotli package
+    (static / assets.DIST_DIR / (hashed + '.br')).write_bytes(b'br:' + CSS)
+    app.extensions['asset_manifest'] = manifest
+    app.asset_path = f'/assets/{hashed}'
+    return app
+
+
+def _get(app, accept_encoding):
+    headers = {} if accept_encoding is None else {'Accept-Encoding': accept_encoding}
+    return app.test_client().get(app.asset_path, headers=headers)
+
+
+@pytest.mark.parametrize('accept_encoding, expected', [
+    (None, None),
+    ('identity', None),
+    ('gzip;q=0', None),
+    ('br;q=0, gzip;q=0', None),
+    ('gzip', 'gzip'),
+    ('br;q=0, gzip', 'gzip'),
+    ('gzip, br', 'br'),
+    ('br;q=0.5, gzip;q=0.8', 'gzip'),
+    ('gzip;q=0.5, identity', None),
+    ('*', 'br'),
+])
+def test_serves_the_variant_the_client_ranks_highest(app, accept_encoding, expected):
+    response = _get(app, accept_encoding)
+    assert response.status_code == 200
+    assert response.content_encoding == expected
+    assert 'Accept-Encoding' in response.vary
+    body = response.get_data()
+    if expected == 'gzip':
+        body = gzip.decompress(body)
+    elif expected == 'br':
+        assert body.startswith(b'br:')
+        body = body[3:]
+    assert body == CSS
+
+
+def test_unknown_asset_is_not_found(app):
+    assert app.test_client().get('/assets/css/site.000000000000.css').status_code == 404
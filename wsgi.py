@@ -0,0 +1,14 @@
+# wsgi.py
+"""
+WSGI entry point for production servers; see gunicorn.conf.py. Unlike run.py it
+never touches the schema: apply migrations with `flask db upgrade` as a deploy
+step before starting the workers.
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv() # Load environment variables from .env file
+
+from app import create_app
+
+app = create_app()